@@ -1,68 +1,227 @@
 """DuckDB connection and query helpers for MIMIC-IV demo database."""
 
-import math
+import atexit
+import contextlib
+import functools
+import os
+import queue
+import threading
+
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 
-DB_PATH = Path(__file__).resolve().parent / "data" / "mimic_iv_demo.duckdb"
+DATA_DIR = Path(__file__).resolve().parent / "data"
+DB_PATH = DATA_DIR / "mimic_iv_demo.duckdb"
+PARQUET_DIR = DATA_DIR / "parquet"
 
+# FastMCP serves tool calls concurrently, and an individual DuckDB
+# connection locks while a query runs. A small pool of long-lived
+# read-only connections gives real cross-call parallelism while still
+# amortizing file-open and catalog-load cost.
+POOL_SIZE = max(2, min(os.cpu_count() or 2, 8))
 
-def get_connection() -> duckdb.DuckDBPyConnection:
-    return duckdb.connect(str(DB_PATH), read_only=True)
+_pool: queue.Queue[duckdb.DuckDBPyConnection] | None = None
+_pool_lock = threading.Lock()
 
 
-def query_df(sql: str, params: list | None = None) -> list[dict]:
-    """Execute SQL and return list of dicts (JSON-safe)."""
-    conn = get_connection()
+def _open_connection() -> duckdb.DuckDBPyConnection:
+    # Prefer serving off the Parquet export when init_db produced one:
+    # scans read the compressed columnar files through the OS page cache
+    # and there is no database file to lock across processes. Fall back
+    # to the .duckdb file otherwise.
+    if PARQUET_DIR.is_dir():
+        conn = duckdb.connect(":memory:")
+        for schema_dir in sorted(PARQUET_DIR.iterdir()):
+            if not schema_dir.is_dir():
+                continue
+            conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_dir.name}")
+            for parquet_file in sorted(schema_dir.glob("*.parquet")):
+                conn.execute(
+                    f"CREATE VIEW {schema_dir.name}.{parquet_file.stem} AS "
+                    f"SELECT * FROM read_parquet('{parquet_file}')"
+                )
+    else:
+        conn = duckdb.connect(str(DB_PATH), read_only=True)
+    conn.execute("PRAGMA threads=4")
+    conn.execute("PRAGMA memory_limit='1GB'")
+    return conn
+
+
+def _close_pool() -> None:
+    if _pool is None:
+        return
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+
+def _connection_pool() -> queue.Queue[duckdb.DuckDBPyConnection]:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool: queue.Queue[duckdb.DuckDBPyConnection] = queue.Queue(
+                    maxsize=POOL_SIZE
+                )
+                for _ in range(POOL_SIZE):
+                    pool.put(_open_connection())
+                atexit.register(_close_pool)
+                _pool = pool
+    return _pool
+
+
+@contextlib.contextmanager
+def get_connection():
+    """Borrow a pooled read-only connection for the duration of a query."""
+    pool = _connection_pool()
+    conn = pool.get()
     try:
-        result = conn.execute(sql, params or []).fetchdf()
-        # Convert timestamps to ISO strings for JSON serialization
-        for col in result.select_dtypes(include=["datetime64", "datetimetz"]).columns:
-            result[col] = result[col].astype(str).replace({"NaT": None})
-        # Replace NaN/NaT with None for JSON compatibility
-        result = result.where(result.notna(), None)
-        records = result.to_dict("records")
-        # Catch any remaining float nan values
-        for row in records:
-            for k, v in row.items():
-                if isinstance(v, float) and math.isnan(v):
-                    row[k] = None
-        return records
+        yield conn
     finally:
-        conn.close()
+        pool.put(conn)
+
+
+def _json_safe(table: pa.Table) -> pa.Table:
+    """Make a result table JSON-serializable column by column.
+
+    Temporal columns become strings, and NaN floats become nulls (Arrow
+    distinguishes NaN from null, so a stored NaN would otherwise survive
+    to_pylist). Both transforms are vectorized; no per-row Python loop.
+    """
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            # strftime runs vectorized over the buffer and preserves nulls.
+            # %S renders fractional digits for sub-second units, so truncate
+            # to second precision first to keep the old pandas rendering.
+            table = table.set_column(
+                i,
+                field.name,
+                pc.strftime(
+                    pc.cast(table.column(i), pa.timestamp("s")),
+                    format="%Y-%m-%d %H:%M:%S",
+                ),
+            )
+        elif pa.types.is_temporal(field.type):
+            table = table.set_column(
+                i, field.name, pc.cast(table.column(i), pa.string())
+            )
+        elif pa.types.is_floating(field.type):
+            col = table.column(i)
+            nan_mask = pc.fill_null(pc.is_nan(col), False)
+            if pc.any(nan_mask).as_py():
+                table = table.set_column(
+                    i, field.name, pc.if_else(nan_mask, None, col)
+                )
+    return table
+
+
+def query_arrow(sql: str, params: list | None = None) -> pa.Table:
+    """Execute SQL and return a columnar Arrow table (JSON-safe columns).
+
+    Tools that only preview a handful of rows can slice the table and
+    materialize dicts just for those rows instead of boxing every row
+    into a Python dict up front.
+    """
+    with get_connection() as conn:
+        table = conn.execute(sql, params or []).fetch_arrow_table()
+    return _json_safe(table)
+
+
+def records_from_table(table: pa.Table) -> list[dict]:
+    """Convert an Arrow table to a list of dicts, column-at-a-time.
+
+    Each column unboxes once into a contiguous Python list, then rows are
+    assembled with dict(zip(...)) — faster than per-row traversal since
+    the per-value work happens in C.
+    """
+    cols = table.to_pydict()
+    return [dict(zip(cols, vals)) for vals in zip(*cols.values())]
+
+
+@functools.lru_cache(maxsize=512)
+def _query_arrow_cached(sql: str, params: tuple) -> pa.Table:
+    return query_arrow(sql, list(params))
+
+
+def query_arrow_cached(sql: str, params: list | None = None) -> pa.Table:
+    """Like query_arrow, but memoized on (sql, params).
+
+    The database is read-only for the life of the process, so repeat
+    point lookups (the same admission referenced across a chat session)
+    can skip the planner and scan entirely. Arrow tables are immutable,
+    making the shared result safe to hand out.
+    """
+    return _query_arrow_cached(sql, tuple(params or ()))
+
+
+def query_many(queries: list[tuple[str, list | None]]) -> list[pa.Table]:
+    """Execute several statements on one pooled connection, in order.
+
+    Tools that need a handful of related result sets pay a single pool
+    borrow instead of one per statement. Each result comes back as a
+    JSON-safe Arrow table in input order.
+    """
+    tables: list[pa.Table] = []
+    with get_connection() as conn:
+        for sql, params in queries:
+            tables.append(
+                _json_safe(conn.execute(sql, params or []).fetch_arrow_table())
+            )
+    return tables
+
+
+@functools.lru_cache(maxsize=256)
+def _query_many_cached(key: tuple[tuple[str, tuple], ...]) -> tuple[pa.Table, ...]:
+    return tuple(query_many([(sql, list(params)) for sql, params in key]))
+
+
+def query_many_cached(queries: list[tuple[str, list | None]]) -> list[pa.Table]:
+    """Like query_many, but memoized on the whole statement batch."""
+    return list(
+        _query_many_cached(
+            tuple((sql, tuple(params or ())) for sql, params in queries)
+        )
+    )
+
+
+def query_scalar_cached(sql: str, params: list | None = None):
+    """Like query_scalar, but memoized on (sql, params)."""
+    table = _query_arrow_cached(sql, tuple(params or ()))
+    return table.column(0)[0].as_py() if table.num_rows else None
+
+
+def query_df(sql: str, params: list | None = None) -> list[dict]:
+    """Execute SQL and return list of dicts (JSON-safe)."""
+    # Arrow nulls convert to None natively, so no NaN/NaT post-scrub needed
+    return records_from_table(query_arrow(sql, params))
 
 
 def query_scalar(sql: str, params: list | None = None):
     """Execute SQL and return single value."""
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         result = conn.execute(sql, params or []).fetchone()
-        return result[0] if result else None
-    finally:
-        conn.close()
+    return result[0] if result else None
 
 
 def query_columns(sql: str, params: list | None = None) -> list[str]:
     """Execute SQL and return column names."""
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         result = conn.execute(sql, params or [])
         return [desc[0] for desc in result.description]
-    finally:
-        conn.close()
 
 
 def list_tables() -> dict[str, list[str]]:
     """Return dict of schema -> [table_names]."""
-    conn = get_connection()
-    try:
+    with get_connection() as conn:
         tables = conn.execute(
             "SELECT table_schema, table_name FROM information_schema.tables "
             "WHERE table_schema LIKE 'mimiciv_%' ORDER BY table_schema, table_name"
         ).fetchall()
-        result: dict[str, list[str]] = {}
-        for schema, table in tables:
-            result.setdefault(schema, []).append(table)
-        return result
-    finally:
-        conn.close()
+    result: dict[str, list[str]] = {}
+    for schema, table in tables:
+        result.setdefault(schema, []).append(table)
+    return result
@@ -1,12 +1,26 @@
 """Download MIMIC-IV Clinical Database Demo and load into DuckDB."""
 
-import io
+import os
+import shutil
+import sys
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import duckdb
 import httpx
 
+# The snapshot build below shares its metric definitions with the health
+# tools so the two can never drift apart.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.health import (  # noqa: E402
+    LAB_METRIC_LABELS,
+    OMR_RESULT_NAMES,
+    SNAPSHOT_DEPTH,
+    VITAL_METRIC_ITEMIDS,
+)
+
 MIMIC_IV_DEMO_URL = (
     "https://physionet.org/static/published-projects/"
     "mimic-iv-demo/mimic-iv-clinical-database-demo-2.2.zip"
@@ -24,17 +38,199 @@ SCHEMA_MAP = {
     "icu": "mimiciv_icu",
 }
 
+# Schema for tables derived from the raw CSVs rather than loaded from them.
+DERIVED_SCHEMA = "mimiciv_derived"
+
+# Sort order applied when exporting these tables to Parquet. The big fact
+# tables are always filtered by subject_id (and usually itemid), so sorting
+# on those lets Parquet row-group statistics prune non-matching groups
+# instead of scanning the whole file.
+EXPORT_ORDER = {
+    "labevents": "subject_id, itemid, charttime",
+    "chartevents": "subject_id, itemid, charttime",
+}
+
 
-def download_zip(url: str) -> bytes:
+def download_zip(url: str) -> Path:
+    """Stream the archive to disk so the whole zip never sits in RAM."""
+    DB_DIR.mkdir(parents=True, exist_ok=True)
+    zip_path = DB_DIR / "mimic_iv_demo.zip"
     print(f"Downloading {url} ...")
     with httpx.Client(follow_redirects=True, timeout=120) as client:
-        resp = client.get(url)
-        resp.raise_for_status()
-    print(f"Downloaded {len(resp.content) / 1024 / 1024:.1f} MB")
-    return resp.content
+        with client.stream("GET", url) as resp:
+            resp.raise_for_status()
+            with open(zip_path, "wb") as f:
+                for chunk in resp.iter_bytes(1 << 20):
+                    f.write(chunk)
+    print(f"Downloaded {zip_path.stat().st_size / 1024 / 1024:.1f} MB")
+    return zip_path
+
+
+def _load_table(
+    conn: duckdb.DuckDBPyConnection, csv_file: Path, full_table: str
+) -> int:
+    """Load one CSV file into a table on a per-thread cursor."""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"CREATE TABLE {full_table} AS "
+        f"SELECT * FROM read_csv_auto('{csv_file}', header=true, ignore_errors=true)"
+    )
+    return cursor.execute(f"SELECT COUNT(*) FROM {full_table}").fetchone()[0]
+
 
+def _quoted(values) -> str:
+    return ", ".join("'" + str(v).replace("'", "''") + "'" for v in values)
 
-def load_into_duckdb(zip_bytes: bytes) -> None:
+
+def build_patient_snapshot(conn: duckdb.DuckDBPyConnection) -> None:
+    """Precompute the per-patient history the health tools read at runtime.
+
+    summarize_patient / get_health_readout need the latest few OMR, lab and
+    vital rows per metric. Computing that on demand means windowed scans of
+    labevents/chartevents on every tool call; evaluating the same
+    ROW_NUMBER() logic once here and storing the top SNAPSHOT_DEPTH rows per
+    metric as STRUCT lists turns each readout into a single point lookup.
+    Timestamps are rendered to strings up front so the structs are JSON-safe
+    as stored.
+    """
+    lab_case = "CASE " + " ".join(
+        f"WHEN di.label IN ({_quoted(labels)}) THEN '{metric}'"
+        for metric, labels in LAB_METRIC_LABELS.items()
+    ) + " ELSE NULL END"
+    vital_case = "CASE " + " ".join(
+        f"WHEN ce.itemid IN ({', '.join(str(i) for i in ids)}) THEN '{metric}'"
+        for metric, ids in VITAL_METRIC_ITEMIDS.items()
+    ) + " ELSE NULL END"
+    all_lab_labels = sorted(
+        {label for labels in LAB_METRIC_LABELS.values() for label in labels}
+    )
+    all_vital_itemids = sorted(
+        {itemid for ids in VITAL_METRIC_ITEMIDS.values() for itemid in ids}
+    )
+
+    conn.execute(f"CREATE SCHEMA IF NOT EXISTS {DERIVED_SCHEMA}")
+    conn.execute(f"""
+        CREATE OR REPLACE TABLE {DERIVED_SCHEMA}.patient_health_snapshot AS
+        WITH omr_ranked AS (
+            SELECT
+                subject_id,
+                result_name,
+                chartdate,
+                seq_num,
+                result_value,
+                ROW_NUMBER() OVER (
+                    PARTITION BY subject_id, result_name
+                    ORDER BY chartdate DESC, seq_num DESC
+                ) AS rn
+            FROM mimiciv_hosp.omr
+            WHERE result_name IN ({_quoted(OMR_RESULT_NAMES)})
+        ),
+        omr_hist AS (
+            SELECT subject_id,
+                LIST({{
+                    'result_name': result_name,
+                    'chartdate': CAST(chartdate AS VARCHAR),
+                    'seq_num': seq_num,
+                    'result_value': result_value
+                }} ORDER BY result_name, chartdate DESC, seq_num DESC) AS omr
+            FROM omr_ranked
+            WHERE rn <= {SNAPSHOT_DEPTH}
+            GROUP BY subject_id
+        ),
+        lab_rows AS (
+            SELECT
+                le.subject_id,
+                {lab_case} AS metric,
+                le.hadm_id,
+                le.charttime,
+                di.label,
+                le.valuenum,
+                le.valueuom,
+                le.flag,
+                le.ref_range_lower,
+                le.ref_range_upper
+            FROM mimiciv_hosp.labevents le
+            JOIN mimiciv_hosp.d_labitems di ON le.itemid = di.itemid
+            WHERE le.valuenum IS NOT NULL
+                AND di.label IN ({_quoted(all_lab_labels)})
+        ),
+        lab_ranked AS (
+            SELECT *,
+                ROW_NUMBER() OVER (
+                    PARTITION BY subject_id, metric
+                    ORDER BY charttime DESC
+                ) AS rn
+            FROM lab_rows
+            WHERE metric IS NOT NULL
+        ),
+        lab_hist AS (
+            SELECT subject_id,
+                LIST({{
+                    'metric': metric,
+                    'hadm_id': hadm_id,
+                    'charttime': strftime(charttime, '%Y-%m-%d %H:%M:%S'),
+                    'label': label,
+                    'valuenum': valuenum,
+                    'valueuom': valueuom,
+                    'flag': flag,
+                    'ref_range_lower': ref_range_lower,
+                    'ref_range_upper': ref_range_upper
+                }} ORDER BY metric, charttime DESC) AS labs
+            FROM lab_ranked
+            WHERE rn <= {SNAPSHOT_DEPTH}
+            GROUP BY subject_id
+        ),
+        vital_rows AS (
+            SELECT
+                ce.subject_id,
+                {vital_case} AS metric,
+                ce.hadm_id,
+                ce.stay_id,
+                ce.charttime,
+                ce.itemid,
+                ce.valuenum,
+                ce.valueuom
+            FROM mimiciv_icu.chartevents ce
+            WHERE ce.valuenum IS NOT NULL
+                AND ce.itemid IN ({', '.join(str(i) for i in all_vital_itemids)})
+        ),
+        vital_ranked AS (
+            SELECT *,
+                ROW_NUMBER() OVER (
+                    PARTITION BY subject_id, metric
+                    ORDER BY charttime DESC
+                ) AS rn
+            FROM vital_rows
+            WHERE metric IS NOT NULL
+        ),
+        vital_hist AS (
+            SELECT subject_id,
+                LIST({{
+                    'metric': metric,
+                    'hadm_id': hadm_id,
+                    'stay_id': stay_id,
+                    'charttime': strftime(charttime, '%Y-%m-%d %H:%M:%S'),
+                    'itemid': itemid,
+                    'valuenum': valuenum,
+                    'valueuom': valueuom
+                }} ORDER BY metric, charttime DESC) AS vitals
+            FROM vital_ranked
+            WHERE rn <= {SNAPSHOT_DEPTH}
+            GROUP BY subject_id
+        )
+        SELECT
+            p.subject_id,
+            o.omr,
+            l.labs,
+            v.vitals
+        FROM mimiciv_hosp.patients p
+        LEFT JOIN omr_hist o USING (subject_id)
+        LEFT JOIN lab_hist l USING (subject_id)
+        LEFT JOIN vital_hist v USING (subject_id)
+    """)
+
+
+def load_into_duckdb(zip_path: Path) -> None:
     DB_DIR.mkdir(parents=True, exist_ok=True)
 
     # Remove existing DB so we start fresh
@@ -42,16 +238,27 @@ def load_into_duckdb(zip_bytes: bytes) -> None:
         DB_PATH.unlink()
 
     conn = duckdb.connect(str(DB_PATH))
+    conn.execute(f"PRAGMA threads={os.cpu_count()}")
 
     # Create schemas
     for schema in SCHEMA_MAP.values():
         conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
 
-    zf = zipfile.ZipFile(io.BytesIO(zip_bytes))
+    zf = zipfile.ZipFile(zip_path)
     csv_files = [n for n in zf.namelist() if n.endswith(".csv.gz") or n.endswith(".csv")]
 
     print(f"Found {len(csv_files)} CSV files in archive")
 
+    # Extract the archive once and point DuckDB at the gzipped CSVs in
+    # place (read_csv_auto handles .gz natively) — no per-file decompress
+    # into RAM and rewrite. Ingestion then runs across a thread pool with
+    # a cursor per worker; DuckDB parallelizes safely across cursors on a
+    # shared connection.
+    raw_dir = DB_DIR / "raw"
+    shutil.rmtree(raw_dir, ignore_errors=True)
+    zf.extractall(raw_dir)
+
+    jobs: list[tuple[Path, str]] = []
     for csv_path in sorted(csv_files):
         parts = Path(csv_path).parts
         # Expect: root_dir / subfolder / filename.csv.gz
@@ -69,46 +276,85 @@ def load_into_duckdb(zip_bytes: bytes) -> None:
         # Derive table name from filename
         table_name = filename.replace(".csv.gz", "").replace(".csv", "")
         full_table = f"{schema}.{table_name}"
+        jobs.append((raw_dir / csv_path, full_table))
+
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(_load_table, conn, csv_file, full_table): full_table
+                for csv_file, full_table in jobs
+            }
+            for future in as_completed(futures):
+                full_table = futures[future]
+                try:
+                    print(f"  Loaded {full_table}: {future.result()} rows")
+                except Exception as e:
+                    print(f"  Loading {full_table} FAILED: {e}")
+    finally:
+        shutil.rmtree(raw_dir, ignore_errors=True)
+
+    print("\nBuilding patient health snapshot ...")
+    build_patient_snapshot(conn)
 
-        print(f"  Loading {csv_path} -> {full_table} ...", end=" ")
-
-        # Extract file to a temp bytes buffer and read with DuckDB
-        csv_data = zf.read(csv_path)
-        # Write to a temp file so DuckDB can read it (handles .gz natively)
-        tmp_path = DB_DIR / filename
-        tmp_path.write_bytes(csv_data)
-
-        try:
-            conn.execute(
-                f"CREATE TABLE {full_table} AS "
-                f"SELECT * FROM read_csv_auto('{tmp_path}', header=true, ignore_errors=true)"
-            )
-            count = conn.execute(f"SELECT COUNT(*) FROM {full_table}").fetchone()[0]
-            print(f"{count} rows")
-        except Exception as e:
-            print(f"FAILED: {e}")
-        finally:
-            tmp_path.unlink(missing_ok=True)
-
-    # Print summary
+    # Print summary: one UNION ALL query instead of a COUNT(*) round-trip
+    # per table.
     print("\n--- Database Summary ---")
-    for schema in SCHEMA_MAP.values():
-        tables = conn.execute(
-            "SELECT table_name FROM information_schema.tables "
-            f"WHERE table_schema = '{schema}' ORDER BY table_name"
-        ).fetchall()
-        print(f"\n{schema}:")
-        for (t,) in tables:
-            count = conn.execute(f"SELECT COUNT(*) FROM {schema}.{t}").fetchone()[0]
-            print(f"  {t}: {count} rows")
+    all_schemas = [*SCHEMA_MAP.values(), DERIVED_SCHEMA]
+    schemas = ", ".join(f"'{schema}'" for schema in all_schemas)
+    tables = conn.execute(
+        "SELECT table_schema, table_name FROM information_schema.tables "
+        f"WHERE table_schema IN ({schemas}) ORDER BY table_schema, table_name"
+    ).fetchall()
+    if tables:
+        count_sql = " UNION ALL ".join(
+            f"SELECT '{schema}' AS table_schema, '{t}' AS table_name, "
+            f"(SELECT COUNT(*) FROM {schema}.{t}) AS n"
+            for schema, t in tables
+        )
+        counts = {
+            (schema, t): n
+            for schema, t, n in conn.execute(count_sql).fetchall()
+        }
+        for schema in all_schemas:
+            print(f"\n{schema}:")
+            for table_schema, t in tables:
+                if table_schema == schema:
+                    print(f"  {t}: {counts[(schema, t)]} rows")
+
+    # Export every table to Parquet as well. The server prefers serving
+    # straight off these files (columnar, compressed, no DB file lock);
+    # the .duckdb file remains as a fallback.
+    parquet_dir = DB_DIR / "parquet"
+    shutil.rmtree(parquet_dir, ignore_errors=True)
+    print("\nExporting Parquet files ...")
+    for schema, t in tables:
+        out_dir = parquet_dir / schema
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = out_dir / f"{t}.parquet"
+        order_by = EXPORT_ORDER.get(t)
+        source = (
+            f"(SELECT * FROM {schema}.{t} ORDER BY {order_by})"
+            if order_by
+            else f"{schema}.{t}"
+        )
+        conn.execute(
+            f"COPY {source} TO '{out_path}' "
+            "(FORMAT PARQUET, COMPRESSION ZSTD)"
+        )
+        print(f"  {out_path.relative_to(DB_DIR)}")
 
+    # Flush the WAL into the main file so read-only opens never replay it
+    conn.execute("CHECKPOINT")
     conn.close()
     print(f"\nDatabase saved to {DB_PATH}")
 
 
 def main():
-    zip_bytes = download_zip(MIMIC_IV_DEMO_URL)
-    load_into_duckdb(zip_bytes)
+    zip_path = download_zip(MIMIC_IV_DEMO_URL)
+    try:
+        load_into_duckdb(zip_path)
+    finally:
+        zip_path.unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 
 import contextlib
 import os
+from importlib import import_module
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
@@ -9,7 +10,8 @@ from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
 from starlette.routing import Mount
 
-from tools import patients, labs, admissions, vitals, health
+# Tool modules to register, in display order. Each exposes register(mcp).
+TOOL_MODULES = ("patients", "labs", "admissions", "vitals", "health")
 
 # ---------------------------------------------------------------------------
 # Server
@@ -81,11 +83,8 @@ mcp = FastMCP(
 # Register tools
 # ---------------------------------------------------------------------------
 
-patients.register(mcp)
-labs.register(mcp)
-admissions.register(mcp)
-vitals.register(mcp)
-health.register(mcp)
+for _name in TOOL_MODULES:
+    import_module(f"tools.{_name}").register(mcp)
 
 # ---------------------------------------------------------------------------
 # ASGI app with CORS + Streamable HTTP transport
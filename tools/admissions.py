@@ -6,6 +6,140 @@ from mcp.types import CallToolResult, TextContent
 import db
 from tools.markdown import md_table
 
+# SQL for the hot tool queries lives at module level so DuckDB sees the
+# exact same statement text on every call (the Python API has no explicit
+# prepared-statement handle; identical verbatim SQL is what lets the
+# engine reuse its parse/plan work).
+ADMISSIONS_SQL = """
+    SELECT
+        hadm_id,
+        admittime,
+        dischtime,
+        deathtime,
+        admission_type,
+        admit_provider_id,
+        admission_location,
+        discharge_location,
+        insurance,
+        language,
+        marital_status,
+        race,
+        edregtime,
+        edouttime,
+        hospital_expire_flag
+    FROM mimiciv_hosp.admissions
+    WHERE subject_id = ?
+    ORDER BY admittime
+"""
+
+ADMISSIONS_COUNT_SQL = (
+    "SELECT COUNT(*) FROM mimiciv_hosp.admissions WHERE subject_id = ?"
+)
+
+DIAGNOSES_SQL = """
+    SELECT
+        d.seq_num,
+        d.icd_code,
+        d.icd_version,
+        COALESCE(di.long_title, d.icd_code) AS diagnosis_title
+    FROM mimiciv_hosp.diagnoses_icd d
+    LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
+        ON d.icd_code = di.icd_code
+        AND d.icd_version = di.icd_version
+    WHERE d.hadm_id = ?
+    ORDER BY d.seq_num
+"""
+
+DIAGNOSES_COUNT_SQL = (
+    "SELECT COUNT(*) FROM mimiciv_hosp.diagnoses_icd WHERE hadm_id = ?"
+)
+
+PRESCRIPTIONS_SQL = """
+    SELECT
+        pharmacy_id,
+        drug,
+        drug_type,
+        prod_strength,
+        dose_val_rx,
+        dose_unit_rx,
+        form_val_disp,
+        form_unit_disp,
+        route,
+        starttime,
+        stoptime
+    FROM mimiciv_hosp.prescriptions
+    WHERE hadm_id = ?
+    ORDER BY starttime
+"""
+
+PRESCRIPTIONS_COUNT_SQL = (
+    "SELECT COUNT(*) FROM mimiciv_hosp.prescriptions WHERE hadm_id = ?"
+)
+
+# LIMIT-pushed variants for the default preview-only path, so DuckDB never
+# returns rows the client will not see.
+ADMISSIONS_LIMITED_SQL = ADMISSIONS_SQL + " LIMIT ?"
+DIAGNOSES_LIMITED_SQL = DIAGNOSES_SQL + " LIMIT ?"
+PRESCRIPTIONS_LIMITED_SQL = PRESCRIPTIONS_SQL + " LIMIT ?"
+
+# One plan for the admissions -> diagnoses -> prescriptions fan-out: each
+# table is scanned once and per-admission details come back as nested
+# lists, instead of 2N follow-up point queries.
+PATIENT_BUNDLE_SQL = """
+    WITH adm AS (
+        SELECT
+            hadm_id,
+            admittime,
+            dischtime,
+            admission_type,
+            admission_location,
+            discharge_location,
+            insurance,
+            race,
+            hospital_expire_flag
+        FROM mimiciv_hosp.admissions
+        WHERE subject_id = ?
+    ),
+    dx AS (
+        SELECT
+            d.hadm_id,
+            LIST(
+                {
+                    'seq_num': d.seq_num,
+                    'icd_code': d.icd_code,
+                    'icd_version': d.icd_version,
+                    'diagnosis_title': COALESCE(di.long_title, d.icd_code)
+                }
+                ORDER BY d.seq_num
+            ) AS diagnoses
+        FROM mimiciv_hosp.diagnoses_icd d
+        LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
+            ON d.icd_code = di.icd_code
+            AND d.icd_version = di.icd_version
+        WHERE d.hadm_id IN (SELECT hadm_id FROM adm)
+        GROUP BY d.hadm_id
+    ),
+    rx AS (
+        SELECT
+            hadm_id,
+            COUNT(*) AS prescription_count,
+            LIST(DISTINCT drug) AS drugs
+        FROM mimiciv_hosp.prescriptions
+        WHERE hadm_id IN (SELECT hadm_id FROM adm)
+            AND drug IS NOT NULL
+        GROUP BY hadm_id
+    )
+    SELECT
+        adm.*,
+        COALESCE(dx.diagnoses, []) AS diagnoses,
+        COALESCE(rx.prescription_count, 0) AS prescription_count,
+        COALESCE(rx.drugs, []) AS drugs
+    FROM adm
+    LEFT JOIN dx USING (hadm_id)
+    LEFT JOIN rx USING (hadm_id)
+    ORDER BY adm.admittime
+"""
+
 
 def register(mcp: FastMCP) -> None:
     @mcp.tool(
@@ -14,43 +148,46 @@ def register(mcp: FastMCP) -> None:
             "Get all hospital admissions for a specific patient in the "
             "MIMIC-IV database. Returns admission/discharge times, "
             "admission type, location, insurance, marital status, and race. "
-            "Requires a subject_id (patient ID)."
+            "Requires a subject_id (patient ID). Returns a preview of "
+            "preview_limit rows by default; pass full=true for every row."
         ),
         meta={
             "openai/toolInvocation/invoking": "Loading admissions...",
             "openai/toolInvocation/invoked": "Admissions loaded",
         },
     )
-    def get_admissions(subject_id: int) -> CallToolResult:
-        rows = db.query_df(
-            """
-            SELECT
-                hadm_id,
-                admittime,
-                dischtime,
-                deathtime,
-                admission_type,
-                admit_provider_id,
-                admission_location,
-                discharge_location,
-                insurance,
-                language,
-                marital_status,
-                race,
-                edregtime,
-                edouttime,
-                hospital_expire_flag
-            FROM mimiciv_hosp.admissions
-            WHERE subject_id = ?
-            ORDER BY admittime
-            """,
-            [subject_id],
+    def get_admissions(
+        subject_id: int,
+        preview_limit: int = 10,
+        full: bool = False,
+    ) -> CallToolResult:
+        count = db.query_scalar(ADMISSIONS_COUNT_SQL, [subject_id]) or 0
+        safe_limit = max(1, min(preview_limit, 50))
+        if full:
+            tbl = db.query_arrow_cached(ADMISSIONS_SQL, [subject_id])
+        else:
+            tbl = db.query_arrow_cached(ADMISSIONS_LIMITED_SQL, [subject_id, safe_limit])
+        preview = tbl.slice(0, safe_limit)
+        # Pull each preview column once instead of a .get() per cell
+        md_rows = list(
+            zip(
+                *(
+                    preview.column(name).to_pylist()
+                    for name in (
+                        "hadm_id",
+                        "admittime",
+                        "dischtime",
+                        "admission_type",
+                        "insurance",
+                        "race",
+                    )
+                )
+            )
         )
-        preview_rows = rows[:10]
         markdown = "\n\n".join(
             [
                 f"## Admissions for Patient {subject_id}",
-                f"Found **{len(rows)}** admission(s).",
+                f"Found **{count}** admission(s).",
                 md_table(
                     [
                         "HADM ID",
@@ -60,21 +197,11 @@ def register(mcp: FastMCP) -> None:
                         "Insurance",
                         "Race",
                     ],
-                    [
-                        [
-                            row.get("hadm_id"),
-                            row.get("admittime"),
-                            row.get("dischtime"),
-                            row.get("admission_type"),
-                            row.get("insurance"),
-                            row.get("race"),
-                        ]
-                        for row in preview_rows
-                    ],
+                    md_rows,
                 ),
                 (
-                    f"_Showing first {len(preview_rows)} of {len(rows)} admission(s)._"
-                    if len(rows) > len(preview_rows)
+                    f"_Showing first {preview.num_rows} of {count} admission(s)._"
+                    if count > preview.num_rows
                     else "_Showing all admissions._"
                 ),
             ]
@@ -88,9 +215,10 @@ def register(mcp: FastMCP) -> None:
                 )
             ],
             structuredContent={
-                "admissions": rows,
+                "admissions": db.records_from_table(tbl),
                 "subject_id": subject_id,
-                "count": len(rows),
+                "count": count,
+                "truncated": tbl.num_rows < count,
             },
         )
 
@@ -100,50 +228,48 @@ def register(mcp: FastMCP) -> None:
             "Get ICD diagnosis codes for a specific hospital admission in "
             "MIMIC-IV. Returns ICD codes with their long title descriptions "
             "and sequence numbers. Requires a hadm_id (hospital admission ID). "
-            "You can get hadm_id values from the get_admissions tool."
+            "You can get hadm_id values from the get_admissions tool. Returns "
+            "a preview of preview_limit rows by default; pass full=true for "
+            "every row."
         ),
         meta={
             "openai/toolInvocation/invoking": "Loading diagnoses...",
             "openai/toolInvocation/invoked": "Diagnoses loaded",
         },
     )
-    def get_diagnoses(hadm_id: int) -> CallToolResult:
-        rows = db.query_df(
-            """
-            SELECT
-                d.seq_num,
-                d.icd_code,
-                d.icd_version,
-                COALESCE(di.long_title, d.icd_code) AS diagnosis_title
-            FROM mimiciv_hosp.diagnoses_icd d
-            LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
-                ON d.icd_code = di.icd_code
-                AND d.icd_version = di.icd_version
-            WHERE d.hadm_id = ?
-            ORDER BY d.seq_num
-            """,
-            [hadm_id],
+    def get_diagnoses(
+        hadm_id: int,
+        preview_limit: int = 15,
+        full: bool = False,
+    ) -> CallToolResult:
+        count = db.query_scalar(DIAGNOSES_COUNT_SQL, [hadm_id]) or 0
+        safe_limit = max(1, min(preview_limit, 50))
+        if full:
+            tbl = db.query_arrow_cached(DIAGNOSES_SQL, [hadm_id])
+        else:
+            tbl = db.query_arrow_cached(DIAGNOSES_LIMITED_SQL, [hadm_id, safe_limit])
+        preview = tbl.slice(0, safe_limit)
+        md_rows = list(
+            zip(
+                *(
+                    preview.column(name).to_pylist()
+                    for name in (
+                        "seq_num",
+                        "icd_code",
+                        "icd_version",
+                        "diagnosis_title",
+                    )
+                )
+            )
         )
-        preview_rows = rows[:15]
         markdown = "\n\n".join(
             [
                 f"## Diagnoses for Admission {hadm_id}",
-                f"Found **{len(rows)}** diagnosis code(s).",
-                md_table(
-                    ["Seq", "ICD Code", "Version", "Diagnosis"],
-                    [
-                        [
-                            row.get("seq_num"),
-                            row.get("icd_code"),
-                            row.get("icd_version"),
-                            row.get("diagnosis_title"),
-                        ]
-                        for row in preview_rows
-                    ],
-                ),
+                f"Found **{count}** diagnosis code(s).",
+                md_table(["Seq", "ICD Code", "Version", "Diagnosis"], md_rows),
                 (
-                    f"_Showing first {len(preview_rows)} of {len(rows)} diagnoses._"
-                    if len(rows) > len(preview_rows)
+                    f"_Showing first {preview.num_rows} of {count} diagnoses._"
+                    if count > preview.num_rows
                     else "_Showing all diagnoses._"
                 ),
             ]
@@ -157,9 +283,10 @@ def register(mcp: FastMCP) -> None:
                 )
             ],
             structuredContent={
-                "diagnoses": rows,
+                "diagnoses": db.records_from_table(tbl),
                 "hadm_id": hadm_id,
-                "count": len(rows),
+                "count": count,
+                "truncated": tbl.num_rows < count,
             },
         )
 
@@ -168,59 +295,121 @@ def register(mcp: FastMCP) -> None:
         description=(
             "Get medication prescriptions for a specific hospital admission "
             "in MIMIC-IV. Returns drug name, dose, route, and timing. "
-            "Requires a hadm_id (hospital admission ID)."
+            "Requires a hadm_id (hospital admission ID). Returns a preview of "
+            "preview_limit rows by default; pass full=true for every row."
         ),
         meta={
             "openai/toolInvocation/invoking": "Loading prescriptions...",
             "openai/toolInvocation/invoked": "Prescriptions loaded",
         },
     )
-    def get_prescriptions(hadm_id: int) -> CallToolResult:
-        rows = db.query_df(
-            """
-            SELECT
-                pharmacy_id,
-                drug,
-                drug_type,
-                prod_strength,
-                dose_val_rx,
-                dose_unit_rx,
-                form_val_disp,
-                form_unit_disp,
-                route,
-                starttime,
-                stoptime
-            FROM mimiciv_hosp.prescriptions
-            WHERE hadm_id = ?
-            ORDER BY starttime
-            """,
-            [hadm_id],
+    def get_prescriptions(
+        hadm_id: int,
+        preview_limit: int = 15,
+        full: bool = False,
+    ) -> CallToolResult:
+        count = db.query_scalar(PRESCRIPTIONS_COUNT_SQL, [hadm_id]) or 0
+        safe_limit = max(1, min(preview_limit, 50))
+        if full:
+            tbl = db.query_arrow_cached(PRESCRIPTIONS_SQL, [hadm_id])
+        else:
+            tbl = db.query_arrow_cached(PRESCRIPTIONS_LIMITED_SQL, [hadm_id, safe_limit])
+        preview = tbl.slice(0, safe_limit)
+        doses = [
+            f"{val or ''} {unit or ''}".strip() or "n/a"
+            for val, unit in zip(
+                preview.column("dose_val_rx").to_pylist(),
+                preview.column("dose_unit_rx").to_pylist(),
+            )
+        ]
+        md_rows = list(
+            zip(
+                preview.column("starttime").to_pylist(),
+                preview.column("drug").to_pylist(),
+                doses,
+                preview.column("route").to_pylist(),
+                preview.column("drug_type").to_pylist(),
+            )
         )
-        preview_rows = rows[:15]
         markdown = "\n\n".join(
             [
                 f"## Prescriptions for Admission {hadm_id}",
-                f"Found **{len(rows)}** prescription(s).",
+                f"Found **{count}** prescription(s).",
+                md_table(["Start Time", "Drug", "Dose", "Route", "Type"], md_rows),
+                (
+                    f"_Showing first {preview.num_rows} of {count} prescriptions._"
+                    if count > preview.num_rows
+                    else "_Showing all prescriptions._"
+                ),
+            ]
+        )
+
+        return CallToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=markdown,
+                )
+            ],
+            structuredContent={
+                "prescriptions": db.records_from_table(tbl),
+                "hadm_id": hadm_id,
+                "count": count,
+                "truncated": tbl.num_rows < count,
+            },
+        )
+
+    @mcp.tool(
+        name="get_patient_bundle",
+        description=(
+            "Get every hospital admission for a patient together with its "
+            "ICD diagnoses and prescribed drugs in one call. Avoids issuing "
+            "separate get_diagnoses/get_prescriptions calls per admission. "
+            "Requires a subject_id (patient ID)."
+        ),
+        meta={
+            "openai/toolInvocation/invoking": "Loading patient bundle...",
+            "openai/toolInvocation/invoked": "Patient bundle loaded",
+        },
+    )
+    def get_patient_bundle(subject_id: int) -> CallToolResult:
+        rows = db.records_from_table(
+            db.query_arrow_cached(PATIENT_BUNDLE_SQL, [subject_id])
+        )
+        md_rows = [
+            [
+                row["hadm_id"],
+                row["admittime"],
+                row["admission_type"],
+                len(row["diagnoses"]),
+                row["prescription_count"],
+                (
+                    row["diagnoses"][0]["diagnosis_title"]
+                    if row["diagnoses"]
+                    else "n/a"
+                ),
+            ]
+            for row in rows[:10]
+        ]
+        markdown = "\n\n".join(
+            [
+                f"## Admission Bundle for Patient {subject_id}",
+                f"Found **{len(rows)}** admission(s) with nested details.",
                 md_table(
-                    ["Start Time", "Drug", "Dose", "Route", "Type"],
                     [
-                        [
-                            row.get("starttime"),
-                            row.get("drug"),
-                            (
-                                f"{row.get('dose_val_rx') or ''} "
-                                f"{row.get('dose_unit_rx') or ''}"
-                            ).strip() or "n/a",
-                            row.get("route"),
-                            row.get("drug_type"),
-                        ]
-                        for row in preview_rows
+                        "HADM ID",
+                        "Admit Time",
+                        "Type",
+                        "Diagnoses",
+                        "Prescriptions",
+                        "Primary Diagnosis",
                     ],
+                    md_rows,
                 ),
                 (
-                    f"_Showing first {len(preview_rows)} of {len(rows)} prescriptions._"
-                    if len(rows) > len(preview_rows)
-                    else "_Showing all prescriptions._"
+                    f"_Showing first {len(md_rows)} of {len(rows)} admission(s)._"
+                    if len(rows) > len(md_rows)
+                    else "_Showing all admissions._"
                 ),
             ]
         )
@@ -233,8 +422,8 @@ def register(mcp: FastMCP) -> None:
                 )
             ],
             structuredContent={
-                "prescriptions": rows,
-                "hadm_id": hadm_id,
+                "admissions": rows,
+                "subject_id": subject_id,
                 "count": len(rows),
             },
         )
@@ -2,7 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import io
+import math
 import re
+from bisect import bisect_right
+from collections.abc import Iterable
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
 from statistics import mean
 from typing import Any
 
@@ -10,7 +19,7 @@ from mcp.server.fastmcp import FastMCP
 from mcp.types import CallToolResult, TextContent, ToolAnnotations
 
 import db
-from tools.markdown import md_bullets, md_table
+from tools.markdown import MD_NO_DATA, md_bullets, md_table, value_unit
 
 OMR_RESULT_NAMES = (
     "Blood Pressure",
@@ -59,18 +68,257 @@ VITAL_DISPLAY_NAMES = {
     "spo2": "SpO2",
 }
 
+# Flattened views of the metric maps, built once at import. The history
+# helpers ship the id lists to SQL and map results back through the
+# reverse maps.
+_ALL_LAB_LABELS: tuple[str, ...] = tuple(
+    sorted({label for labels in LAB_METRIC_LABELS.values() for label in labels})
+)
+_LABEL_TO_METRIC: dict[str, str] = {
+    label: metric for metric, labels in LAB_METRIC_LABELS.items() for label in labels
+}
 
-def _as_float(value: Any) -> float | None:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
+_ALL_VITAL_ITEMIDS: tuple[int, ...] = tuple(
+    sorted({itemid for ids in VITAL_METRIC_ITEMIDS.values() for itemid in ids})
+)
+_ITEMID_TO_METRIC: dict[int, str] = {
+    itemid: metric for metric, ids in VITAL_METRIC_ITEMIDS.items() for itemid in ids
+}
+
+# Rows kept per metric in the precomputed patient snapshot built by
+# scripts/init_db.py. Requests for deeper history fall back to the live
+# windowed queries below.
+SNAPSHOT_DEPTH = 8
+
+# Fixed SQL lives at module level so DuckDB receives identical statement
+# text on every call (same pattern as tools/admissions.py). The history
+# queries stay inline because their text depends on the filters applied.
+_PATIENT_SQL = """
+    SELECT
+        p.subject_id,
+        p.gender,
+        p.anchor_age,
+        p.anchor_year,
+        p.anchor_year_group,
+        p.dod,
+        COUNT(DISTINCT a.hadm_id) AS admission_count,
+        MIN(a.admittime) AS first_admittime,
+        MAX(a.dischtime) AS last_dischtime,
+        MAX(COALESCE(a.hospital_expire_flag, 0)) AS had_in_hospital_mortality
+    FROM mimiciv_hosp.patients p
+    LEFT JOIN mimiciv_hosp.admissions a
+        ON p.subject_id = a.subject_id
+    WHERE p.subject_id = ?
+    GROUP BY
+        p.subject_id, p.gender, p.anchor_age, p.anchor_year,
+        p.anchor_year_group, p.dod
+"""
+
+_ICU_STAY_COUNT_SQL = (
+    "SELECT COUNT(*) FROM mimiciv_icu.icustays WHERE subject_id = ?"
+)
+
+_ADMISSIONS_SQL = """
+    SELECT
+        hadm_id,
+        admittime,
+        dischtime,
+        deathtime,
+        admission_type,
+        admission_location,
+        discharge_location,
+        insurance,
+        race,
+        hospital_expire_flag,
+        DATE_DIFF('day', admittime, dischtime) AS length_of_stay_days
+    FROM mimiciv_hosp.admissions
+    WHERE subject_id = ?
+    ORDER BY admittime DESC
+"""
+
+_ADMISSION_DIAGNOSES_SQL = """
+    SELECT
+        d.seq_num,
+        d.icd_code,
+        d.icd_version,
+        COALESCE(di.long_title, d.icd_code) AS diagnosis_title
+    FROM mimiciv_hosp.diagnoses_icd d
+    LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
+        ON d.icd_code = di.icd_code
+        AND d.icd_version = di.icd_version
+    WHERE d.hadm_id = ?
+    ORDER BY d.seq_num
+    LIMIT ?
+"""
+
+_CHRONIC_DIAGNOSES_SQL = """
+    SELECT
+        COALESCE(di.long_title, d.icd_code) AS diagnosis_title,
+        COUNT(*) AS mentions
+    FROM mimiciv_hosp.diagnoses_icd d
+    JOIN mimiciv_hosp.admissions a ON d.hadm_id = a.hadm_id
+    LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
+        ON d.icd_code = di.icd_code
+        AND d.icd_version = di.icd_version
+    WHERE a.subject_id = ?
+    GROUP BY diagnosis_title
+    ORDER BY mentions DESC, diagnosis_title
+    LIMIT ?
+"""
+
+_SNAPSHOT_SQL = """
+    SELECT omr, labs, vitals
+    FROM mimiciv_derived.patient_health_snapshot
+    WHERE subject_id = ?
+"""
+
+_SNAPSHOT_PROBE_SQL = """
+    SELECT COUNT(*) FROM information_schema.tables
+    WHERE table_schema = 'mimiciv_derived'
+        AND table_name = 'patient_health_snapshot'
+"""
+
+# OMR_RESULT_NAMES is fixed, so the placeholder list is expanded once at
+# import and DuckDB sees identical statement text on every call.
+_OMR_HISTORY_SQL = f"""
+    SELECT result_name, chartdate, seq_num, result_value
+    FROM mimiciv_hosp.omr
+    WHERE subject_id = ?
+        AND result_name IN ({",".join("?" for _ in OMR_RESULT_NAMES)})
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY result_name
+        ORDER BY chartdate DESC, seq_num DESC
+    ) <= ?
+    ORDER BY result_name, chartdate DESC, seq_num DESC
+"""
+
+# Cheap probes run before the admission-scoped history fetches: short
+# stays often have no lab or ICU rows at all, and a point lookup beats
+# dispatching the LATERAL plan just to learn that.
+_LAB_EXISTS_SQL = "SELECT 1 FROM mimiciv_hosp.labevents WHERE hadm_id = ? LIMIT 1"
+
+_VITAL_EXISTS_SQL = "SELECT 1 FROM mimiciv_icu.chartevents WHERE hadm_id = ? LIMIT 1"
+
+# Lab/vital history fetches the top rows per label/itemid with a LATERAL
+# join: each branch stops after `per_metric` rows instead of window-ranking
+# every matching row for the patient. The label/itemid -> metric mapping
+# happens in Python afterwards.
+_LAB_HISTORY_SQL = """
+    SELECT
+        t.label,
+        x.hadm_id,
+        x.charttime,
+        x.valuenum,
+        x.valueuom,
+        x.flag,
+        x.ref_range_lower,
+        x.ref_range_upper
+    FROM unnest(?) AS t(label)
+    CROSS JOIN LATERAL (
+        SELECT
+            le.hadm_id,
+            le.charttime,
+            le.valuenum,
+            le.valueuom,
+            le.flag,
+            le.ref_range_lower,
+            le.ref_range_upper
+        FROM mimiciv_hosp.labevents le
+        JOIN mimiciv_hosp.d_labitems di ON le.itemid = di.itemid
+        WHERE le.subject_id = ?
+            AND di.label = t.label
+            AND le.valuenum IS NOT NULL
+        ORDER BY le.charttime DESC
+        LIMIT ?
+    ) x
+    ORDER BY t.label, x.charttime DESC
+"""
+
+_LAB_HISTORY_BY_HADM_SQL = _LAB_HISTORY_SQL.replace(
+    "AND le.valuenum IS NOT NULL",
+    "AND le.hadm_id = ?\n            AND le.valuenum IS NOT NULL",
+)
+
+_VITAL_HISTORY_SQL = """
+    SELECT
+        t.itemid,
+        x.hadm_id,
+        x.stay_id,
+        x.charttime,
+        x.valuenum,
+        x.valueuom
+    FROM unnest(?) AS t(itemid)
+    CROSS JOIN LATERAL (
+        SELECT
+            ce.hadm_id,
+            ce.stay_id,
+            ce.charttime,
+            ce.valuenum,
+            ce.valueuom
+        FROM mimiciv_icu.chartevents ce
+        WHERE ce.subject_id = ?
+            AND ce.itemid = t.itemid
+            AND ce.valuenum IS NOT NULL
+        ORDER BY ce.charttime DESC
+        LIMIT ?
+    ) x
+    ORDER BY t.itemid, x.charttime DESC
+"""
+
+_VITAL_HISTORY_BY_HADM_SQL = _VITAL_HISTORY_SQL.replace(
+    "AND ce.valuenum IS NOT NULL",
+    "AND ce.hadm_id = ?\n            AND ce.valuenum IS NOT NULL",
+)
+
+_RECENT_MEDICATIONS_SQL = """
+    SELECT
+        drug,
+        drug_type,
+        route,
+        dose_val_rx,
+        dose_unit_rx,
+        starttime,
+        stoptime
+    FROM mimiciv_hosp.prescriptions
+    WHERE hadm_id = ?
+        AND drug IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY drug
+        ORDER BY starttime DESC NULLS LAST
+    ) = 1
+    ORDER BY starttime DESC NULLS LAST
+    LIMIT ?
+"""
+
+
+# Compiled once; _build_readout parses the same handful of result_value
+# strings dozens of times per readout, so the string paths are memoized
+# (OMR values repeat heavily across patients too).
+_FLOAT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_BP_RE = re.compile(r"(\d{2,3})\s*/\s*(\d{2,3})")
+
+
+@functools.lru_cache(maxsize=8192)
+def _as_float_str(text: str) -> float | None:
+    # Most string inputs are plain numbers ("27.4"); float() accepts those
+    # directly, leaving the regex for embedded values like "184 lbs". The
+    # finite check keeps float()-isms like "nan"/"inf" mapping to None as
+    # the regex path always did.
+    try:
+        value = float(text)
+    except ValueError:
+        pass
+    else:
+        return value if math.isfinite(value) else None
 
-    text = str(value).strip()
+    text = text.strip()
     if not text:
         return None
 
-    match = re.search(r"-?\d+(?:\.\d+)?", text.replace(",", ""))
+    # Thousands separators are rare; only copy the string when one exists.
+    if "," in text:
+        text = text.replace(",", "")
+    match = _FLOAT_RE.search(text)
     if not match:
         return None
     try:
@@ -79,22 +327,49 @@ def _as_float(value: Any) -> float | None:
         return None
 
 
-def _parse_bp(value: Any) -> tuple[float | None, float | None]:
+def _as_float(value: Any) -> float | None:
+    # Most callers pass valuenum/result_value straight from DuckDB, which
+    # arrive as float (or int/Decimal); only genuine text reaches the regex.
+    if isinstance(value, float):
+        return value
     if value is None:
-        return None, None
-    text = str(value)
-    match = re.search(r"(\d{2,3})\s*/\s*(\d{2,3})", text)
+        return None
+    if isinstance(value, (int, Decimal)):
+        return float(value)
+    return _as_float_str(str(value))
+
+
+def _numeric(row: dict[str, Any] | None, key: str) -> float | None:
+    """Float access for columns DuckDB already returns as numbers."""
+    if row is None:
+        return None
+    value = row[key]
+    return float(value) if value is not None else None
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_bp_str(text: str) -> tuple[float | None, float | None]:
+    match = _BP_RE.search(text)
     if not match:
         return None, None
     return float(match.group(1)), float(match.group(2))
 
 
+def _parse_bp(value: Any) -> tuple[float | None, float | None]:
+    if value is None:
+        return None, None
+    return _parse_bp_str(str(value))
+
+
+# Scores are always 0-100, so status resolution is a plain table lookup.
+_STATUS_TABLE = tuple(
+    "high-risk" if score < 65 else "needs-attention" if score < 85 else "good"
+    for score in range(101)
+)
+
+
 def _status_from_score(score: int) -> str:
-    if score >= 85:
-        return "good"
-    if score >= 65:
-        return "needs-attention"
-    return "high-risk"
+    return _STATUS_TABLE[score]
 
 
 def _trend_direction(
@@ -116,75 +391,64 @@ def _fmt_number(value: float | None, decimals: int = 1) -> str | None:
     return f"{value:.{decimals}f}"
 
 
+# These helpers are pure functions of their ids over a read-only database,
+# so they go through db.query_arrow_cached: repeat questions about the same
+# patient skip the joins entirely, while records_from_table still hands each
+# caller fresh dicts (the cached Arrow table itself is immutable).
 def _query_patient(subject_id: int) -> dict[str, Any] | None:
-    rows = db.query_df(
-        """
-        SELECT
-            p.subject_id,
-            p.gender,
-            p.anchor_age,
-            p.anchor_year,
-            p.anchor_year_group,
-            p.dod,
-            COUNT(DISTINCT a.hadm_id) AS admission_count,
-            MIN(a.admittime) AS first_admittime,
-            MAX(a.dischtime) AS last_dischtime,
-            MAX(COALESCE(a.hospital_expire_flag, 0)) AS had_in_hospital_mortality
-        FROM mimiciv_hosp.patients p
-        LEFT JOIN mimiciv_hosp.admissions a
-            ON p.subject_id = a.subject_id
-        WHERE p.subject_id = ?
-        GROUP BY
-            p.subject_id, p.gender, p.anchor_age, p.anchor_year,
-            p.anchor_year_group, p.dod
-        """,
-        [subject_id],
-    )
+    rows = db.records_from_table(db.query_arrow_cached(_PATIENT_SQL, [subject_id]))
     if not rows:
         return None
 
     patient = rows[0]
-    patient["icu_stay_count"] = db.query_scalar(
-        "SELECT COUNT(*) FROM mimiciv_icu.icustays WHERE subject_id = ?",
+    patient["icu_stay_count"] = db.query_scalar_cached(
+        _ICU_STAY_COUNT_SQL,
         [subject_id],
     )
     return patient
 
 
-def _query_admissions(subject_id: int) -> list[dict[str, Any]]:
-    return db.query_df(
-        """
-        SELECT
-            hadm_id,
-            admittime,
-            dischtime,
-            deathtime,
-            admission_type,
-            admission_location,
-            discharge_location,
-            insurance,
-            race,
-            hospital_expire_flag,
-            DATE_DIFF('day', admittime, dischtime) AS length_of_stay_days
-        FROM mimiciv_hosp.admissions
-        WHERE subject_id = ?
-        ORDER BY admittime DESC
-        """,
-        [subject_id],
+def _query_patient_with_admissions(
+    subject_id: int,
+) -> tuple[dict[str, Any] | None, list[dict[str, Any]], dict[int, dict[str, Any]]]:
+    """Fetch the patient row, ICU stay count and admission list together.
+
+    The three statements batch on one pooled connection (same shape as
+    _query_admission_bundle) instead of paying a borrow and round trip
+    each; the miss path still comes back as (None, [], {}). The by-id
+    index costs one pointer assignment per row while the records are in
+    hand and turns _select_admission into a dict probe.
+    """
+    patient_table, icu_count_table, admissions_table = db.query_many_cached(
+        [
+            (_PATIENT_SQL, [subject_id]),
+            (_ICU_STAY_COUNT_SQL, [subject_id]),
+            (_ADMISSIONS_SQL, [subject_id]),
+        ]
     )
+    patient_rows = db.records_from_table(patient_table)
+    if not patient_rows:
+        return None, [], {}
+
+    patient = patient_rows[0]
+    patient["icu_stay_count"] = icu_count_table.column(0)[0].as_py()
+    admissions = db.records_from_table(admissions_table)
+    return patient, admissions, {row["hadm_id"]: row for row in admissions}
 
 
 def _select_admission(
-    admissions: list[dict[str, Any]], hadm_id: int | None
+    admissions: list[dict[str, Any]],
+    admissions_by_id: dict[int, dict[str, Any]],
+    hadm_id: int | None,
 ) -> tuple[dict[str, Any] | None, str | None]:
     if not admissions:
         return None, None
     if hadm_id is None:
         return admissions[0], None
 
-    for admission in admissions:
-        if admission["hadm_id"] == hadm_id:
-            return admission, None
+    admission = admissions_by_id.get(hadm_id)
+    if admission is not None:
+        return admission, None
 
     return admissions[0], (
         f"Requested hadm_id {hadm_id} was not found for this patient. "
@@ -192,112 +456,131 @@ def _select_admission(
     )
 
 
-def _query_diagnoses_for_admission(hadm_id: int, limit: int = 12) -> list[dict[str, Any]]:
-    return db.query_df(
-        """
-        SELECT
-            d.seq_num,
-            d.icd_code,
-            d.icd_version,
-            COALESCE(di.long_title, d.icd_code) AS diagnosis_title
-        FROM mimiciv_hosp.diagnoses_icd d
-        LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
-            ON d.icd_code = di.icd_code
-            AND d.icd_version = di.icd_version
-        WHERE d.hadm_id = ?
-        ORDER BY d.seq_num
-        LIMIT ?
-        """,
-        [hadm_id, limit],
+def _query_admission_bundle(
+    subject_id: int, hadm_id: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Fetch admission diagnoses, the chronic rollup and recent medications.
+
+    The three statements run back-to-back on one pooled connection (and
+    cache as a batch), so the summary pays a single borrow for all of them.
+    """
+    diagnoses, chronic, medications = db.query_many_cached(
+        [
+            (_ADMISSION_DIAGNOSES_SQL, [hadm_id, 12]),
+            (_CHRONIC_DIAGNOSES_SQL, [subject_id, 8]),
+            (_RECENT_MEDICATIONS_SQL, [hadm_id, 12]),
+        ]
+    )
+    return (
+        db.records_from_table(diagnoses),
+        db.records_from_table(chronic),
+        db.records_from_table(medications),
     )
 
 
 def _query_chronic_diagnoses(subject_id: int, limit: int = 8) -> list[dict[str, Any]]:
-    return db.query_df(
-        """
-        SELECT
-            COALESCE(di.long_title, d.icd_code) AS diagnosis_title,
-            COUNT(*) AS mentions
-        FROM mimiciv_hosp.diagnoses_icd d
-        JOIN mimiciv_hosp.admissions a ON d.hadm_id = a.hadm_id
-        LEFT JOIN mimiciv_hosp.d_icd_diagnoses di
-            ON d.icd_code = di.icd_code
-            AND d.icd_version = di.icd_version
-        WHERE a.subject_id = ?
-        GROUP BY diagnosis_title
-        ORDER BY mentions DESC, diagnosis_title
-        LIMIT ?
-        """,
-        [subject_id, limit],
+    return db.records_from_table(
+        db.query_arrow_cached(_CHRONIC_DIAGNOSES_SQL, [subject_id, limit])
     )
 
 
-def _query_recent_medications(hadm_id: int, limit: int = 12) -> list[dict[str, Any]]:
-    return db.query_df(
-        """
-        WITH ranked AS (
-            SELECT
-                drug,
-                drug_type,
-                route,
-                dose_val_rx,
-                dose_unit_rx,
-                starttime,
-                stoptime,
-                ROW_NUMBER() OVER (
-                    PARTITION BY drug
-                    ORDER BY starttime DESC NULLS LAST
-                ) AS rn
-            FROM mimiciv_hosp.prescriptions
-            WHERE hadm_id = ?
-                AND drug IS NOT NULL
-        )
-        SELECT
-            drug,
-            drug_type,
-            route,
-            dose_val_rx,
-            dose_unit_rx,
-            starttime,
-            stoptime
-        FROM ranked
-        WHERE rn = 1
-        ORDER BY starttime DESC NULLS LAST
-        LIMIT ?
-        """,
-        [hadm_id, limit],
-    )
+_snapshot_available: bool | None = None
+
 
+def _has_snapshot() -> bool:
+    """Probe once per process for the precomputed snapshot table.
 
-def _query_omr_history(subject_id: int, per_metric: int = 2) -> dict[str, list[dict[str, Any]]]:
-    placeholders = ",".join("?" for _ in OMR_RESULT_NAMES)
-    rows = db.query_df(
-        f"""
-        WITH ranked AS (
-            SELECT
-                result_name,
-                chartdate,
-                seq_num,
-                result_value,
-                ROW_NUMBER() OVER (
-                    PARTITION BY result_name
-                    ORDER BY chartdate DESC, seq_num DESC
-                ) AS rn
-            FROM mimiciv_hosp.omr
-            WHERE subject_id = ?
-                AND result_name IN ({placeholders})
+    Databases built before scripts/init_db.py grew the snapshot step do not
+    have it; the history helpers then keep using the live windowed queries.
+    """
+    global _snapshot_available
+    if _snapshot_available is None:
+        _snapshot_available = bool(db.query_scalar(_SNAPSHOT_PROBE_SQL))
+    return _snapshot_available
+
+
+def _query_snapshot(subject_id: int) -> dict[str, dict[str, list[dict[str, Any]]]] | None:
+    """Fetch the precomputed omr/lab/vital history in one round-trip.
+
+    Returns the histories grouped by metric at SNAPSHOT_DEPTH rows each, or
+    None when the snapshot table is absent or has no row for the patient.
+    The struct fields match what the live queries below would return.
+    """
+    if not _has_snapshot():
+        return None
+    table = db.query_arrow(_SNAPSHOT_SQL, [subject_id])
+    if table.num_rows == 0:
+        return None
+
+    # Unbox each struct-list column straight off the Arrow table; the lists
+    # are stored ordered by metric, so a single groupby pass per column
+    # yields each metric's rows.
+    omr_items, lab_items, vital_items = (
+        table.column(name)[0].as_py() or [] for name in ("omr", "labs", "vitals")
+    )
+    omr: dict[str, list[dict[str, Any]]] = {name: [] for name in OMR_RESULT_NAMES}
+    for name, group in groupby(omr_items, key=itemgetter("result_name")):
+        omr[name] = list(group)
+    labs: dict[str, list[dict[str, Any]]] = {metric: [] for metric in LAB_METRIC_LABELS}
+    for metric, group in groupby(lab_items, key=itemgetter("metric")):
+        labs[metric] = list(group)
+    vitals: dict[str, list[dict[str, Any]]] = {metric: [] for metric in VITAL_METRIC_ITEMIDS}
+    for metric, group in groupby(vital_items, key=itemgetter("metric")):
+        vitals[metric] = list(group)
+    return {"omr": omr, "labs": labs, "vitals": vitals}
+
+
+def _query_omr_history(
+    subject_id: int,
+    per_metric: int = 2,
+    snapshot: dict[str, dict[str, list[dict[str, Any]]]] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    if snapshot is not None and per_metric <= SNAPSHOT_DEPTH:
+        return {m: rows[:per_metric] for m, rows in snapshot["omr"].items()}
+    rows = db.records_from_table(
+        db.query_arrow_cached(
+            _OMR_HISTORY_SQL, [subject_id, *OMR_RESULT_NAMES, per_metric]
         )
-        SELECT result_name, chartdate, seq_num, result_value
-        FROM ranked
-        WHERE rn <= ?
-        ORDER BY result_name, chartdate DESC, seq_num DESC
-        """,
-        [subject_id, *OMR_RESULT_NAMES, per_metric],
     )
 
+    # Rows arrive ordered by result_name, so one groupby pass suffices.
     history: dict[str, list[dict[str, Any]]] = {name: [] for name in OMR_RESULT_NAMES}
-    for row in rows:
-        history.setdefault(row["result_name"], []).append(row)
+    for name, group in groupby(rows, key=itemgetter("result_name")):
+        history[name] = list(group)
+    return history
+
+
+def _history_from_columns(
+    cols: dict[str, list],
+    key_column: str,
+    key_to_metric: dict[Any, str],
+    metrics: Iterable[str],
+    per_metric: int,
+) -> dict[str, list[dict[str, Any]]]:
+    """Group a columnar LATERAL result by metric, boxing only kept rows.
+
+    Each LATERAL branch returns up to per_metric rows per label/itemid,
+    newest first; metrics backed by several ids need one more trim. The
+    grouping and trim work on row indices over the column arrays, so rows
+    that fall past the cutoff never become Python dicts.
+    """
+    index_by_metric: dict[str, list[int]] = {metric: [] for metric in metrics}
+    for idx, key in enumerate(cols[key_column]):
+        metric = key_to_metric.get(key)
+        if metric is not None:
+            index_by_metric[metric].append(idx)
+
+    names = list(cols)
+    charttimes = cols["charttime"]
+    history: dict[str, list[dict[str, Any]]] = {}
+    for metric, indexes in index_by_metric.items():
+        if len(indexes) > per_metric:
+            indexes.sort(key=lambda i: str(charttimes[i] or ""), reverse=True)
+            indexes = indexes[:per_metric]
+        history[metric] = [
+            {**{name: cols[name][i] for name in names}, "metric": metric}
+            for i in indexes
+        ]
     return history
 
 
@@ -305,138 +588,50 @@ def _query_lab_history(
     subject_id: int,
     hadm_id: int | None = None,
     per_metric: int = 2,
+    snapshot: dict[str, dict[str, list[dict[str, Any]]]] | None = None,
 ) -> dict[str, list[dict[str, Any]]]:
-    all_labels = sorted({label for labels in LAB_METRIC_LABELS.values() for label in labels})
-    label_placeholders = ",".join("?" for _ in all_labels)
-    hadm_clause = "AND le.hadm_id = ?" if hadm_id is not None else ""
-
-    case_lines = []
-    for metric, labels in LAB_METRIC_LABELS.items():
-        quoted_labels = ", ".join("'" + label.replace("'", "''") + "'" for label in labels)
-        case_lines.append(f"WHEN di.label IN ({quoted_labels}) THEN '{metric}'")
-    case_sql = "CASE " + " ".join(case_lines) + " ELSE NULL END"
+    # Admission-scoped history cannot be answered from the subject-level
+    # snapshot: an older admission's rows may rank below the cutoff.
+    if snapshot is not None and hadm_id is None and per_metric <= SNAPSHOT_DEPTH:
+        return {m: rows[:per_metric] for m, rows in snapshot["labs"].items()}
 
-    params: list[Any] = [subject_id, *all_labels]
+    all_labels = list(_ALL_LAB_LABELS)
     if hadm_id is not None:
-        params.append(hadm_id)
-    params.append(per_metric)
-
-    rows = db.query_df(
-        f"""
-        WITH lab_candidates AS (
-            SELECT
-                le.hadm_id,
-                le.charttime,
-                di.label,
-                le.valuenum,
-                le.valueuom,
-                le.flag,
-                le.ref_range_lower,
-                le.ref_range_upper,
-                {case_sql} AS metric
-            FROM mimiciv_hosp.labevents le
-            JOIN mimiciv_hosp.d_labitems di ON le.itemid = di.itemid
-            WHERE le.subject_id = ?
-                AND le.valuenum IS NOT NULL
-                AND di.label IN ({label_placeholders})
-                {hadm_clause}
-        ),
-        ranked AS (
-            SELECT *,
-                ROW_NUMBER() OVER (
-                    PARTITION BY metric
-                    ORDER BY charttime DESC
-                ) AS rn
-            FROM lab_candidates
-            WHERE metric IS NOT NULL
+        if db.query_scalar_cached(_LAB_EXISTS_SQL, [hadm_id]) is None:
+            return {metric: [] for metric in LAB_METRIC_LABELS}
+        table = db.query_arrow(
+            _LAB_HISTORY_BY_HADM_SQL, [all_labels, subject_id, hadm_id, per_metric]
         )
-        SELECT
-            metric,
-            hadm_id,
-            charttime,
-            label,
-            valuenum,
-            valueuom,
-            flag,
-            ref_range_lower,
-            ref_range_upper
-        FROM ranked
-        WHERE rn <= ?
-        ORDER BY metric, charttime DESC
-        """,
-        params,
-    )
+    else:
+        table = db.query_arrow(_LAB_HISTORY_SQL, [all_labels, subject_id, per_metric])
 
-    history: dict[str, list[dict[str, Any]]] = {metric: [] for metric in LAB_METRIC_LABELS}
-    for row in rows:
-        history.setdefault(row["metric"], []).append(row)
-    return history
+    return _history_from_columns(
+        table.to_pydict(), "label", _LABEL_TO_METRIC, LAB_METRIC_LABELS, per_metric
+    )
 
 
 def _query_vital_history(
     subject_id: int,
     hadm_id: int | None = None,
     per_metric: int = 2,
+    snapshot: dict[str, dict[str, list[dict[str, Any]]]] | None = None,
 ) -> dict[str, list[dict[str, Any]]]:
-    all_itemids = sorted({itemid for ids in VITAL_METRIC_ITEMIDS.values() for itemid in ids})
-    id_placeholders = ",".join("?" for _ in all_itemids)
-    hadm_clause = "AND ce.hadm_id = ?" if hadm_id is not None else ""
-
-    case_lines = []
-    for metric, ids in VITAL_METRIC_ITEMIDS.items():
-        case_lines.append(f"WHEN ce.itemid IN ({', '.join(str(i) for i in ids)}) THEN '{metric}'")
-    case_sql = "CASE " + " ".join(case_lines) + " ELSE NULL END"
+    if snapshot is not None and hadm_id is None and per_metric <= SNAPSHOT_DEPTH:
+        return {m: rows[:per_metric] for m, rows in snapshot["vitals"].items()}
 
-    params: list[Any] = [subject_id, *all_itemids]
+    all_itemids = list(_ALL_VITAL_ITEMIDS)
     if hadm_id is not None:
-        params.append(hadm_id)
-    params.append(per_metric)
-
-    rows = db.query_df(
-        f"""
-        WITH vital_candidates AS (
-            SELECT
-                ce.hadm_id,
-                ce.stay_id,
-                ce.charttime,
-                ce.itemid,
-                ce.valuenum,
-                ce.valueuom,
-                {case_sql} AS metric
-            FROM mimiciv_icu.chartevents ce
-            WHERE ce.subject_id = ?
-                AND ce.valuenum IS NOT NULL
-                AND ce.itemid IN ({id_placeholders})
-                {hadm_clause}
-        ),
-        ranked AS (
-            SELECT *,
-                ROW_NUMBER() OVER (
-                    PARTITION BY metric
-                    ORDER BY charttime DESC
-                ) AS rn
-            FROM vital_candidates
-            WHERE metric IS NOT NULL
+        if db.query_scalar_cached(_VITAL_EXISTS_SQL, [hadm_id]) is None:
+            return {metric: [] for metric in VITAL_METRIC_ITEMIDS}
+        table = db.query_arrow(
+            _VITAL_HISTORY_BY_HADM_SQL, [all_itemids, subject_id, hadm_id, per_metric]
         )
-        SELECT
-            metric,
-            hadm_id,
-            stay_id,
-            charttime,
-            itemid,
-            valuenum,
-            valueuom
-        FROM ranked
-        WHERE rn <= ?
-        ORDER BY metric, charttime DESC
-        """,
-        params,
-    )
+    else:
+        table = db.query_arrow(_VITAL_HISTORY_SQL, [all_itemids, subject_id, per_metric])
 
-    history: dict[str, list[dict[str, Any]]] = {metric: [] for metric in VITAL_METRIC_ITEMIDS}
-    for row in rows:
-        history.setdefault(row["metric"], []).append(row)
-    return history
+    return _history_from_columns(
+        table.to_pydict(), "itemid", _ITEMID_TO_METRIC, VITAL_METRIC_ITEMIDS, per_metric
+    )
 
 
 def _score_bp(systolic: float | None, diastolic: float | None) -> tuple[int, str, str]:
@@ -457,43 +652,64 @@ def _score_bp(systolic: float | None, diastolic: float | None) -> tuple[int, str
     return 94, "good", "Blood pressure is in the target range."
 
 
+# The monotone scorers are threshold ladders; keeping the bands as data
+# and indexing with bisect makes the cutoffs auditable in one place and
+# lets a future cohort tool score whole arrays against the same tables.
+# Band i applies below threshold i; the last band is the open tail.
+_BMI_THRESHOLDS = (16.0, 18.5, 25.0, 30.0, 35.0, 40.0)
+_BMI_BANDS = (
+    (40, "high-risk", "BMI indicates severe underweight."),
+    (64, "needs-attention", "BMI is below the healthy range."),
+    (94, "good", "BMI is in the healthy range."),
+    (78, "needs-attention", "BMI is in the overweight range."),
+    (60, "high-risk", "BMI is in obesity class I."),
+    (50, "high-risk", "BMI is in obesity class II."),
+    (40, "high-risk", "BMI is in obesity class III."),
+)
+
+_A1C_THRESHOLDS = (5.7, 6.5, 8.0)
+_A1C_BANDS = (
+    (94, "good", "A1c is in non-diabetic range."),
+    (78, "needs-attention", "A1c is in prediabetes range."),
+    (60, "high-risk", "A1c is above diabetic target range."),
+    (45, "high-risk", "A1c is markedly elevated."),
+)
+
+# The historical glucose cutoffs are <70 but <=140 and <=199; raising the
+# inclusive ones by one ulp lets a single bisect_right serve all bands.
+_GLUCOSE_THRESHOLDS = (
+    70.0,
+    math.nextafter(140.0, math.inf),
+    math.nextafter(199.0, math.inf),
+)
+_GLUCOSE_BANDS = (
+    (40, "high-risk", "Glucose is in hypoglycemic range."),
+    (88, "good", "Glucose is in a reasonable range."),
+    (70, "needs-attention", "Glucose is elevated."),
+    (48, "high-risk", "Glucose is markedly elevated."),
+)
+
+_SPO2_THRESHOLDS = (90.0, 95.0)
+_SPO2_BANDS = (
+    (45, "high-risk", "Oxygen saturation is low."),
+    (70, "needs-attention", "Oxygen saturation is mildly low."),
+    (92, "good", "Oxygen saturation is in the target range."),
+)
+
+
 def _score_bmi(bmi: float | None) -> tuple[int, str, str]:
     if bmi is None:
         return 50, "unknown", "No recent BMI data."
-    if bmi < 16:
-        return 40, "high-risk", "BMI indicates severe underweight."
-    if bmi < 18.5:
-        return 64, "needs-attention", "BMI is below the healthy range."
-    if bmi < 25:
-        return 94, "good", "BMI is in the healthy range."
-    if bmi < 30:
-        return 78, "needs-attention", "BMI is in the overweight range."
-    if bmi < 35:
-        return 60, "high-risk", "BMI is in obesity class I."
-    if bmi < 40:
-        return 50, "high-risk", "BMI is in obesity class II."
-    return 40, "high-risk", "BMI is in obesity class III."
+    return _BMI_BANDS[bisect_right(_BMI_THRESHOLDS, bmi)]
 
 
 def _score_glucose(a1c: float | None, glucose: float | None) -> tuple[int, str, str, str]:
     if a1c is not None:
-        if a1c < 5.7:
-            return 94, "good", "A1c is in non-diabetic range.", "a1c"
-        if a1c < 6.5:
-            return 78, "needs-attention", "A1c is in prediabetes range.", "a1c"
-        if a1c < 8.0:
-            return 60, "high-risk", "A1c is above diabetic target range.", "a1c"
-        return 45, "high-risk", "A1c is markedly elevated.", "a1c"
+        return (*_A1C_BANDS[bisect_right(_A1C_THRESHOLDS, a1c)], "a1c")
 
     if glucose is None:
         return 50, "unknown", "No recent glucose markers.", "glucose"
-    if glucose < 70:
-        return 40, "high-risk", "Glucose is in hypoglycemic range.", "glucose"
-    if glucose <= 140:
-        return 88, "good", "Glucose is in a reasonable range.", "glucose"
-    if glucose <= 199:
-        return 70, "needs-attention", "Glucose is elevated.", "glucose"
-    return 48, "high-risk", "Glucose is markedly elevated.", "glucose"
+    return (*_GLUCOSE_BANDS[bisect_right(_GLUCOSE_THRESHOLDS, glucose)], "glucose")
 
 
 def _score_kidney(creatinine: float | None, bun: float | None) -> tuple[int, str, str]:
@@ -524,11 +740,7 @@ def _score_kidney(creatinine: float | None, bun: float | None) -> tuple[int, str
 def _score_spo2(spo2: float | None) -> tuple[int, str, str]:
     if spo2 is None:
         return 50, "unknown", "No recent oxygen saturation values."
-    if spo2 >= 95:
-        return 92, "good", "Oxygen saturation is in the target range."
-    if spo2 >= 90:
-        return 70, "needs-attention", "Oxygen saturation is mildly low."
-    return 45, "high-risk", "Oxygen saturation is low."
+    return _SPO2_BANDS[bisect_right(_SPO2_THRESHOLDS, spo2)]
 
 
 def _hematology_component_scores(
@@ -585,24 +797,23 @@ def _hematology_component_scores(
     return score, status, insight
 
 
-def _latest(history: dict[str, list[dict[str, Any]]], metric: str) -> dict[str, Any] | None:
-    rows = history.get(metric, [])
-    return rows[0] if rows else None
-
-
-def _previous(history: dict[str, list[dict[str, Any]]], metric: str) -> dict[str, Any] | None:
-    rows = history.get(metric, [])
-    return rows[1] if len(rows) > 1 else None
+def _latest_pairs(
+    history: dict[str, list[dict[str, Any]]],
+) -> dict[str, tuple[dict[str, Any] | None, dict[str, Any] | None]]:
+    """Extract (latest, previous) per metric in one pass over a history dict."""
+    return {
+        metric: (rows[0] if rows else None, rows[1] if len(rows) > 1 else None)
+        for metric, rows in history.items()
+    }
 
 
 def _normalize_latest_labs(
-    labs: dict[str, list[dict[str, Any]]],
+    lab_pair: dict[str, tuple[dict[str, Any] | None, dict[str, Any] | None]],
 ) -> list[dict[str, Any]]:
     output: list[dict[str, Any]] = []
-    for metric, rows in labs.items():
-        if not rows:
+    for metric, (row, _) in lab_pair.items():
+        if row is None:
             continue
-        row = rows[0]
         output.append(
             {
                 "metric": metric,
@@ -622,13 +833,12 @@ def _normalize_latest_labs(
 
 
 def _normalize_latest_vitals(
-    vitals: dict[str, list[dict[str, Any]]],
+    vital_pair: dict[str, tuple[dict[str, Any] | None, dict[str, Any] | None]],
 ) -> list[dict[str, Any]]:
     output: list[dict[str, Any]] = []
-    for metric, rows in vitals.items():
-        if not rows:
+    for metric, (row, _) in vital_pair.items():
+        if row is None:
             continue
-        row = rows[0]
         output.append(
             {
                 "metric": metric,
@@ -644,16 +854,38 @@ def _normalize_latest_vitals(
     return output
 
 
-def _build_readout(
+def _build_readout_and_latest(
     subject_id: int,
     omr: dict[str, list[dict[str, Any]]],
     labs: dict[str, list[dict[str, Any]]],
     vitals: dict[str, list[dict[str, Any]]],
+) -> tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Score the readout and emit the normalized latest rows in one pass.
+
+    The scorer and the latest-row normalizers consume the same history
+    dicts, so each dict is destructured into (latest, previous) pairs
+    exactly once and both consumers work off the shared pairs instead of
+    re-walking the history lists.
+    """
+    omr_pair = _latest_pairs(omr)
+    lab_pair = _latest_pairs(labs)
+    vital_pair = _latest_pairs(vitals)
+    return (
+        _build_readout(subject_id, omr_pair, lab_pair, vital_pair),
+        _normalize_latest_labs(lab_pair),
+        _normalize_latest_vitals(vital_pair),
+    )
+
+
+def _build_readout(
+    subject_id: int,
+    omr_pair: dict[str, tuple[dict[str, Any] | None, dict[str, Any] | None]],
+    lab_pair: dict[str, tuple[dict[str, Any] | None, dict[str, Any] | None]],
+    vital_pair: dict[str, tuple[dict[str, Any] | None, dict[str, Any] | None]],
 ) -> dict[str, Any]:
     cards: list[dict[str, Any]] = []
 
-    bp_latest = _latest(omr, "Blood Pressure")
-    bp_prev = _previous(omr, "Blood Pressure")
+    bp_latest, bp_prev = omr_pair["Blood Pressure"]
     source = "OMR"
     bp_sys, bp_dia = _parse_bp(bp_latest["result_value"]) if bp_latest else (None, None)
     prev_sys, prev_dia = _parse_bp(bp_prev["result_value"]) if bp_prev else (None, None)
@@ -661,21 +893,20 @@ def _build_readout(
     value_label = None
 
     if bp_sys is None or bp_dia is None:
-        vital_sys = _latest(vitals, "systolic_bp")
-        vital_dia = _latest(vitals, "diastolic_bp")
+        vital_sys, prev_sys_row = vital_pair["systolic_bp"]
+        vital_dia, prev_dia_row = vital_pair["diastolic_bp"]
         if vital_sys and vital_dia:
-            bp_sys = _as_float(vital_sys["valuenum"])
-            bp_dia = _as_float(vital_dia["valuenum"])
-            prev_sys_row = _previous(vitals, "systolic_bp")
-            prev_dia_row = _previous(vitals, "diastolic_bp")
-            prev_sys = _as_float(prev_sys_row["valuenum"]) if prev_sys_row else None
-            prev_dia = _as_float(prev_dia_row["valuenum"]) if prev_dia_row else None
+            bp_sys = _numeric(vital_sys, "valuenum")
+            bp_dia = _numeric(vital_dia, "valuenum")
+            prev_sys = _numeric(prev_sys_row, "valuenum")
+            prev_dia = _numeric(prev_dia_row, "valuenum")
             recorded_at = max(str(vital_sys["charttime"]), str(vital_dia["charttime"]))
             source = "ICU vitals"
 
     bp_score, bp_status, bp_insight = _score_bp(bp_sys, bp_dia)
     if bp_sys is not None and bp_dia is not None:
-        value_label = f"{int(round(bp_sys))}/{int(round(bp_dia))}"
+        # round() on a float already yields an int.
+        value_label = f"{round(bp_sys)}/{round(bp_dia)}"
     bp_trend = "no-trend"
     bp_delta_text = None
     if bp_sys is not None and bp_dia is not None and prev_sys is not None and prev_dia is not None:
@@ -684,16 +915,15 @@ def _build_readout(
         if sys_dir == "stable" and dia_dir == "stable":
             bp_trend = "stable"
             bp_delta_text = "stable vs prior reading"
-        elif sys_dir == "up" or dia_dir == "up":
-            bp_trend = "up"
-            bp_delta_text = (
-                f"+{abs(int(round(sys_delta or 0)))}/+{abs(int(round(dia_delta or 0)))} vs prior"
-            )
         else:
-            bp_trend = "down"
-            bp_delta_text = (
-                f"-{abs(int(round(sys_delta or 0)))}/-{abs(int(round(dia_delta or 0)))} vs prior"
-            )
+            sys_step = abs(round(sys_delta or 0))
+            dia_step = abs(round(dia_delta or 0))
+            if sys_dir == "up" or dia_dir == "up":
+                bp_trend = "up"
+                bp_delta_text = f"+{sys_step}/+{dia_step} vs prior"
+            else:
+                bp_trend = "down"
+                bp_delta_text = f"-{sys_step}/-{dia_step} vs prior"
 
     cards.append(
         {
@@ -711,14 +941,13 @@ def _build_readout(
         }
     )
 
-    bmi_latest = _latest(omr, "BMI (kg/m2)")
-    bmi_prev = _previous(omr, "BMI (kg/m2)")
-    weight_latest = _latest(omr, "Weight (Lbs)")
-    weight_prev = _previous(omr, "Weight (Lbs)")
-    height_latest = _latest(omr, "Height (Inches)")
+    bmi_latest, bmi_prev = omr_pair["BMI (kg/m2)"]
+    weight_latest, weight_prev = omr_pair["Weight (Lbs)"]
+    height_latest, _ = omr_pair["Height (Inches)"]
 
     bmi_val = _as_float(bmi_latest["result_value"]) if bmi_latest else None
     weight_lbs = _as_float(weight_latest["result_value"]) if weight_latest else None
+    prev_weight_lbs = _as_float(weight_prev["result_value"]) if weight_prev else None
     height_inches = _as_float(height_latest["result_value"]) if height_latest else None
     if bmi_val is None and weight_lbs is not None and height_inches and height_inches > 0:
         bmi_val = (weight_lbs * 703.0) / (height_inches * height_inches)
@@ -750,19 +979,17 @@ def _build_readout(
                 else None
             ),
             "secondary_trend": (
-                f"{(_as_float(weight_latest['result_value']) - _as_float(weight_prev['result_value'])):+.1f} lbs"
-                if weight_latest and weight_prev
-                and _as_float(weight_latest["result_value"]) is not None
-                and _as_float(weight_prev["result_value"]) is not None
+                f"{(weight_lbs - prev_weight_lbs):+.1f} lbs"
+                if weight_lbs is not None and prev_weight_lbs is not None
                 else None
             ),
         }
     )
 
-    glucose_latest = _latest(labs, "glucose")
-    a1c_latest = _latest(labs, "a1c")
-    glucose_val = _as_float(glucose_latest["valuenum"]) if glucose_latest else None
-    a1c_val = _as_float(a1c_latest["valuenum"]) if a1c_latest else None
+    glucose_latest, _ = lab_pair["glucose"]
+    a1c_latest, _ = lab_pair["a1c"]
+    glucose_val = _numeric(glucose_latest, "valuenum")
+    a1c_val = _numeric(a1c_latest, "valuenum")
     glucose_score, glucose_status, glucose_insight, glucose_basis = _score_glucose(a1c_val, glucose_val)
 
     cards.append(
@@ -791,10 +1018,10 @@ def _build_readout(
         }
     )
 
-    creatinine_latest = _latest(labs, "creatinine")
-    bun_latest = _latest(labs, "bun")
-    creatinine_val = _as_float(creatinine_latest["valuenum"]) if creatinine_latest else None
-    bun_val = _as_float(bun_latest["valuenum"]) if bun_latest else None
+    creatinine_latest, _ = lab_pair["creatinine"]
+    bun_latest, _ = lab_pair["bun"]
+    creatinine_val = _numeric(creatinine_latest, "valuenum")
+    bun_val = _numeric(bun_latest, "valuenum")
     kidney_score, kidney_status, kidney_insight = _score_kidney(creatinine_val, bun_val)
 
     cards.append(
@@ -817,10 +1044,9 @@ def _build_readout(
         }
     )
 
-    spo2_latest = _latest(vitals, "spo2")
-    spo2_val = _as_float(spo2_latest["valuenum"]) if spo2_latest else None
-    spo2_prev_row = _previous(vitals, "spo2")
-    spo2_prev = _as_float(spo2_prev_row["valuenum"]) if spo2_prev_row else None
+    spo2_latest, spo2_prev_row = vital_pair["spo2"]
+    spo2_val = _numeric(spo2_latest, "valuenum")
+    spo2_prev = _numeric(spo2_prev_row, "valuenum")
     spo2_score, spo2_status, spo2_insight = _score_spo2(spo2_val)
     spo2_trend, spo2_delta = _trend_direction(spo2_val, spo2_prev, stable_band=1.0)
 
@@ -844,10 +1070,17 @@ def _build_readout(
         }
     )
 
-    hemoglobin = _as_float(_latest(labs, "hemoglobin")["valuenum"]) if _latest(labs, "hemoglobin") else None
-    wbc = _as_float(_latest(labs, "wbc")["valuenum"]) if _latest(labs, "wbc") else None
-    platelets = _as_float(_latest(labs, "platelets")["valuenum"]) if _latest(labs, "platelets") else None
+    hgb_row, _ = lab_pair["hemoglobin"]
+    wbc_row, _ = lab_pair["wbc"]
+    plt_row, _ = lab_pair["platelets"]
+    hemoglobin = _numeric(hgb_row, "valuenum")
+    wbc = _numeric(wbc_row, "valuenum")
+    platelets = _numeric(plt_row, "valuenum")
     heme_score, heme_status, heme_insight = _hematology_component_scores(hemoglobin, wbc, platelets)
+    heme_recorded_at = (
+        max(str(row["charttime"]) if row else "" for row in (hgb_row, wbc_row, plt_row))
+        or None
+    )
 
     cards.append(
         {
@@ -861,14 +1094,7 @@ def _build_readout(
                 f"Plt {_fmt_number(platelets, 0) or 'NA'}"
             ),
             "unit": "",
-            "recorded_at": max(
-                [
-                    str(_latest(labs, "hemoglobin")["charttime"]) if _latest(labs, "hemoglobin") else "",
-                    str(_latest(labs, "wbc")["charttime"]) if _latest(labs, "wbc") else "",
-                    str(_latest(labs, "platelets")["charttime"]) if _latest(labs, "platelets") else "",
-                ]
-            )
-            or None,
+            "recorded_at": heme_recorded_at,
             "trend": "no-trend",
             "trend_detail": None,
             "insight": heme_insight,
@@ -892,9 +1118,11 @@ def _build_readout(
         "cards": cards,
         "insights": insights,
         "available_data": {
-            "has_omr": any(bool(rows) for rows in omr.values()),
-            "has_labs": any(bool(rows) for rows in labs.values()),
-            "has_icu_vitals": any(bool(rows) for rows in vitals.values()),
+            "has_omr": any(latest is not None for latest, _ in omr_pair.values()),
+            "has_labs": any(latest is not None for latest, _ in lab_pair.values()),
+            "has_icu_vitals": any(
+                latest is not None for latest, _ in vital_pair.values()
+            ),
         },
     }
 
@@ -942,6 +1170,30 @@ def _build_summary_text(
     return " ".join(parts)
 
 
+# Row-to-cells extractors for the tables below. itemgetter pulls every
+# column of a row dict in one C call and returns the tuple md_table
+# iterates, instead of a per-row list build with repeated .get probes.
+# The upstream builders guarantee the keys, so no .get fallback needed.
+_DIAGNOSIS_CELLS = itemgetter("seq_num", "icd_code", "diagnosis_title")
+_MEDICATION_CELLS = itemgetter(
+    "drug", "dose_val_rx", "dose_unit_rx", "route", "starttime", "stoptime"
+)
+_LAB_CELLS = itemgetter("display_name", "value", "unit", "flag", "charttime")
+_VITAL_CELLS = itemgetter("display_name", "value", "unit", "charttime")
+_CARD_CELLS = itemgetter("title", "score", "status", "value", "unit", "insight")
+
+# Column-header tuples shared by both builders; list literals at the
+# call sites would be rebuilt on every render.
+_ADMISSION_HEADERS = (
+    "HADM ID", "Admission Type", "Admit Time", "Discharge Time", "Race",
+)
+_DIAGNOSIS_HEADERS = ("Seq", "ICD Code", "Diagnosis")
+_MEDICATION_HEADERS = ("Drug", "Dose", "Route", "Start", "Stop")
+_LAB_HEADERS = ("Metric", "Value", "Flag", "Time")
+_VITAL_HEADERS = ("Metric", "Value", "Time")
+_CARD_HEADERS = ("Domain", "Score", "Status", "Value", "Insight")
+
+
 def _build_summary_markdown(
     *,
     patient: dict[str, Any],
@@ -955,21 +1207,35 @@ def _build_summary_markdown(
     summary_text: str,
     warning: str | None,
 ) -> str:
-    overview = summary_text
-    demographics = md_bullets(
-        [
-            f"Sex: {patient.get('gender')}",
-            f"Anchor age: {patient.get('anchor_age')}",
-            f"Admissions in dataset: {patient.get('admission_count')}",
-            f"ICU stays in dataset: {patient.get('icu_stay_count')}",
-            f"Anchor year group: {patient.get('anchor_year_group')}",
-        ],
-        empty_text="_No demographic fields available._",
+    # The whole document streams into one buffer; md_table writes its
+    # lines straight into it, so no per-section table string is built
+    # just to be re-joined and thrown away.
+    buf = io.StringIO()
+    write = buf.write
+
+    write(f"## Patient Summary: {patient.get('subject_id')}\n\n")
+    write(summary_text)
+
+    write("\n\n### Demographics\n\n")
+    write(
+        md_bullets(
+            [
+                f"Sex: {patient.get('gender')}",
+                f"Anchor age: {patient.get('anchor_age')}",
+                f"Admissions in dataset: {patient.get('admission_count')}",
+                f"ICU stays in dataset: {patient.get('icu_stay_count')}",
+                f"Anchor year group: {patient.get('anchor_year_group')}",
+            ],
+            empty_text="_No demographic fields available._",
+        )
     )
 
-    admission_table = md_table(
-        ["HADM ID", "Admission Type", "Admit Time", "Discharge Time", "Race"],
-        (
+    # Empty sections write MD_NO_DATA directly rather than paying for
+    # an md_table call and comprehension just to produce it.
+    write("\n\n### Focused Admission\n\n")
+    if selected_admission is not None:
+        md_table(
+            _ADMISSION_HEADERS,
             [
                 [
                     selected_admission.get("hadm_id"),
@@ -978,125 +1244,117 @@ def _build_summary_markdown(
                     selected_admission.get("dischtime"),
                     selected_admission.get("race"),
                 ]
-            ]
-            if selected_admission is not None
-            else []
-        ),
-    )
-    diagnoses_table = md_table(
-        ["Seq", "ICD Code", "Diagnosis"],
-        [
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Diagnoses (Admission)\n\n")
+    if diagnoses:
+        md_table(
+            _DIAGNOSIS_HEADERS,
+            [_DIAGNOSIS_CELLS(row) for row in diagnoses[:12]],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Chronic Conditions (Across Admissions)\n\n")
+    write(
+        md_bullets(
             [
-                row.get("seq_num"),
-                row.get("icd_code"),
-                row.get("diagnosis_title"),
-            ]
-            for row in diagnoses[:12]
-        ],
-    )
-    chronic_list = md_bullets(
-        [
-            f"{row.get('diagnosis_title')} (mentions: {row.get('mentions')})"
-            for row in chronic_conditions[:8]
-        ],
-        empty_text="_No chronic-condition rollup available._",
+                f"{row.get('diagnosis_title')} (mentions: {row.get('mentions')})"
+                for row in chronic_conditions[:8]
+            ],
+            empty_text="_No chronic-condition rollup available._",
+        )
     )
-    medication_table = md_table(
-        ["Drug", "Dose", "Route", "Start", "Stop"],
-        [
+
+    write("\n\n### Recent Medications\n\n")
+    if medications:
+        md_table(
+            _MEDICATION_HEADERS,
             [
-                row.get("drug"),
                 (
-                    f"{row.get('dose_val_rx') or ''} "
-                    f"{row.get('dose_unit_rx') or ''}"
-                ).strip()
-                or "n/a",
-                row.get("route"),
-                row.get("starttime"),
-                row.get("stoptime"),
-            ]
-            for row in medications[:12]
-        ],
-    )
-    labs_table = md_table(
-        ["Metric", "Value", "Flag", "Time"],
-        [
+                    drug,
+                    f"{dose_val or ''} {dose_unit or ''}".strip() or "n/a",
+                    route,
+                    start,
+                    stop,
+                )
+                for drug, dose_val, dose_unit, route, start, stop in map(
+                    _MEDICATION_CELLS, medications[:12]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Key Labs\n\n")
+    if latest_labs:
+        md_table(
+            _LAB_HEADERS,
             [
-                row.get("display_name"),
-                (
-                    f"{row.get('value') if row.get('value') is not None else 'n/a'} "
-                    f"{row.get('unit') or ''}"
-                ).strip(),
-                row.get("flag") or "normal",
-                row.get("charttime"),
-            ]
-            for row in latest_labs[:12]
-        ],
-    )
-    vitals_table = md_table(
-        ["Metric", "Value", "Time"],
-        [
+                (name, value_unit(value, unit), flag or "normal", charttime)
+                for name, value, unit, flag, charttime in map(
+                    _LAB_CELLS, latest_labs[:12]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Key Vitals\n\n")
+    if latest_vitals:
+        md_table(
+            _VITAL_HEADERS,
             [
-                row.get("display_name"),
-                (
-                    f"{row.get('value') if row.get('value') is not None else 'n/a'} "
-                    f"{row.get('unit') or ''}"
-                ).strip(),
-                row.get("charttime"),
-            ]
-            for row in latest_vitals[:12]
-        ],
+                (name, value_unit(value, unit), charttime)
+                for name, value, unit, charttime in map(
+                    _VITAL_CELLS, latest_vitals[:12]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Health Readout\n\n")
+    write(
+        f"Overall score: **{readout.get('overall_score')}/100** "
+        f"({readout.get('overall_status')})."
     )
-    readout_table = md_table(
-        ["Domain", "Score", "Status", "Value", "Insight"],
-        [
+    write("\n\n")
+    cards = readout.get("cards", [])
+    if cards:
+        md_table(
+            _CARD_HEADERS,
             [
-                row.get("title"),
-                f"{row.get('score')}/100",
-                row.get("status"),
-                (
-                    f"{row.get('value') if row.get('value') is not None else 'n/a'} "
-                    f"{row.get('unit') or ''}"
-                ).strip(),
-                row.get("insight"),
-            ]
-            for row in readout.get("cards", [])[:12]
-        ],
-    )
-    concern_list = md_bullets(
-        readout.get("insights", [])[:6],
-        empty_text="_No priority concerns flagged._",
+                (title, f"{score}/100", status, value_unit(value, unit), insight)
+                for title, score, status, value, unit, insight in map(
+                    _CARD_CELLS, cards[:12]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Priority Concerns\n\n")
+    write(
+        md_bullets(
+            readout.get("insights", [])[:6],
+            empty_text="_No priority concerns flagged._",
+        )
     )
 
-    sections = [
-        f"## Patient Summary: {patient.get('subject_id')}",
-        overview,
-        "### Demographics",
-        demographics,
-        "### Focused Admission",
-        admission_table,
-        "### Diagnoses (Admission)",
-        diagnoses_table,
-        "### Chronic Conditions (Across Admissions)",
-        chronic_list,
-        "### Recent Medications",
-        medication_table,
-        "### Key Labs",
-        labs_table,
-        "### Key Vitals",
-        vitals_table,
-        "### Health Readout",
-        (
-            f"Overall score: **{readout.get('overall_score')}/100** "
-            f"({readout.get('overall_status')})."
-        ),
-        readout_table,
-        "### Priority Concerns",
-        concern_list,
-    ]
     if warning:
-        sections.extend(["### Note", warning])
-    return "\n\n".join(sections)
+        write("\n\n### Note\n\n")
+        write(warning)
+    return buf.getvalue()
 
 
 def _build_readout_markdown(
@@ -1106,73 +1364,69 @@ def _build_readout_markdown(
     latest_labs: list[dict[str, Any]],
     latest_vitals: list[dict[str, Any]],
 ) -> str:
-    score_line = (
+    buf = io.StringIO()
+    write = buf.write
+
+    write(f"## Health Readout: Patient {subject_id}\n\n")
+    write(
         f"Overall score: **{readout.get('overall_score')}/100** "
         f"({readout.get('overall_status')})."
     )
-    readout_table = md_table(
-        ["Domain", "Score", "Status", "Value", "Insight"],
-        [
+
+    write("\n\n### Domain Scores\n\n")
+    cards = readout.get("cards", [])
+    if cards:
+        md_table(
+            _CARD_HEADERS,
             [
-                row.get("title"),
-                f"{row.get('score')}/100",
-                row.get("status"),
-                (
-                    f"{row.get('value') if row.get('value') is not None else 'n/a'} "
-                    f"{row.get('unit') or ''}"
-                ).strip(),
-                row.get("insight"),
-            ]
-            for row in readout.get("cards", [])[:12]
-        ],
+                (title, f"{score}/100", status, value_unit(value, unit), insight)
+                for title, score, status, value, unit, insight in map(
+                    _CARD_CELLS, cards[:12]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Priority Concerns\n\n")
+    write(
+        md_bullets(
+            readout.get("insights", [])[:6],
+            empty_text="_No priority concerns flagged._",
+        )
     )
-    labs_table = md_table(
-        ["Metric", "Value", "Flag", "Time"],
-        [
+
+    write("\n\n### Latest Labs\n\n")
+    if latest_labs:
+        md_table(
+            _LAB_HEADERS,
             [
-                row.get("display_name"),
-                (
-                    f"{row.get('value') if row.get('value') is not None else 'n/a'} "
-                    f"{row.get('unit') or ''}"
-                ).strip(),
-                row.get("flag") or "normal",
-                row.get("charttime"),
-            ]
-            for row in latest_labs[:10]
-        ],
-    )
-    vitals_table = md_table(
-        ["Metric", "Value", "Time"],
-        [
+                (name, value_unit(value, unit), flag or "normal", charttime)
+                for name, value, unit, flag, charttime in map(
+                    _LAB_CELLS, latest_labs[:10]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+
+    write("\n\n### Latest Vitals\n\n")
+    if latest_vitals:
+        md_table(
+            _VITAL_HEADERS,
             [
-                row.get("display_name"),
-                (
-                    f"{row.get('value') if row.get('value') is not None else 'n/a'} "
-                    f"{row.get('unit') or ''}"
-                ).strip(),
-                row.get("charttime"),
-            ]
-            for row in latest_vitals[:10]
-        ],
-    )
-    concern_list = md_bullets(
-        readout.get("insights", [])[:6],
-        empty_text="_No priority concerns flagged._",
-    )
-    return "\n\n".join(
-        [
-            f"## Health Readout: Patient {subject_id}",
-            score_line,
-            "### Domain Scores",
-            readout_table,
-            "### Priority Concerns",
-            concern_list,
-            "### Latest Labs",
-            labs_table,
-            "### Latest Vitals",
-            vitals_table,
-        ]
-    )
+                (name, value_unit(value, unit), charttime)
+                for name, value, unit, charttime in map(
+                    _VITAL_CELLS, latest_vitals[:10]
+                )
+            ],
+            out=buf,
+        )
+    else:
+        write(MD_NO_DATA)
+    return buf.getvalue()
 
 
 def register(mcp: FastMCP) -> None:
@@ -1191,11 +1445,17 @@ def register(mcp: FastMCP) -> None:
             openWorldHint=False,
         ),
     )
-    def summarize_patient(
+    async def summarize_patient(
         subject_id: int,
         hadm_id: int | None = None,
     ) -> CallToolResult:
-        patient = _query_patient(subject_id)
+        # The per-patient lookups are independent; running them on worker
+        # threads lets the pooled connections serve them in parallel
+        # instead of back-to-back on the event loop.
+        (patient, admissions, admissions_by_id), snapshot = await asyncio.gather(
+            asyncio.to_thread(_query_patient_with_admissions, subject_id),
+            asyncio.to_thread(_query_snapshot, subject_id),
+        )
         if not patient:
             return CallToolResult(
                 isError=True,
@@ -1207,29 +1467,48 @@ def register(mcp: FastMCP) -> None:
                 ],
             )
 
-        admissions = _query_admissions(subject_id)
-        selected_admission, warning = _select_admission(admissions, hadm_id)
+        selected_admission, warning = _select_admission(
+            admissions, admissions_by_id, hadm_id
+        )
         selected_hadm_id = selected_admission["hadm_id"] if selected_admission else None
 
-        diagnoses = (
-            _query_diagnoses_for_admission(selected_hadm_id)
-            if selected_hadm_id is not None
-            else []
+        if selected_hadm_id is not None:
+            bundle_thread = asyncio.to_thread(
+                _query_admission_bundle, subject_id, selected_hadm_id
+            )
+        else:
+            bundle_thread = asyncio.to_thread(
+                lambda: ([], _query_chronic_diagnoses(subject_id), [])
+            )
+
+        (
+            (diagnoses, chronic_conditions, medications),
+            omr_history,
+            lab_history,
+            vital_history,
+        ) = await asyncio.gather(
+            bundle_thread,
+            asyncio.to_thread(
+                _query_omr_history, subject_id, per_metric=2, snapshot=snapshot
+            ),
+            asyncio.to_thread(
+                _query_lab_history,
+                subject_id,
+                hadm_id=selected_hadm_id,
+                per_metric=2,
+                snapshot=snapshot,
+            ),
+            asyncio.to_thread(
+                _query_vital_history,
+                subject_id,
+                hadm_id=selected_hadm_id,
+                per_metric=2,
+                snapshot=snapshot,
+            ),
         )
-        chronic_conditions = _query_chronic_diagnoses(subject_id)
-        medications = (
-            _query_recent_medications(selected_hadm_id)
-            if selected_hadm_id is not None
-            else []
+        readout, latest_labs, latest_vitals = _build_readout_and_latest(
+            subject_id, omr_history, lab_history, vital_history
         )
-
-        omr_history = _query_omr_history(subject_id, per_metric=2)
-        lab_history = _query_lab_history(subject_id, hadm_id=selected_hadm_id, per_metric=2)
-        vital_history = _query_vital_history(subject_id, hadm_id=selected_hadm_id, per_metric=2)
-        readout = _build_readout(subject_id, omr_history, lab_history, vital_history)
-
-        latest_labs = _normalize_latest_labs(lab_history)
-        latest_vitals = _normalize_latest_vitals(vital_history)
         summary_text = _build_summary_text(
             patient=patient,
             selected_admission=selected_admission,
@@ -1286,8 +1565,11 @@ def register(mcp: FastMCP) -> None:
             openWorldHint=False,
         ),
     )
-    def get_health_readout(subject_id: int) -> CallToolResult:
-        patient = _query_patient(subject_id)
+    async def get_health_readout(subject_id: int) -> CallToolResult:
+        patient, snapshot = await asyncio.gather(
+            asyncio.to_thread(_query_patient, subject_id),
+            asyncio.to_thread(_query_snapshot, subject_id),
+        )
         if not patient:
             return CallToolResult(
                 isError=True,
@@ -1299,10 +1581,28 @@ def register(mcp: FastMCP) -> None:
                 ],
             )
 
-        omr_history = _query_omr_history(subject_id, per_metric=2)
-        lab_history = _query_lab_history(subject_id, hadm_id=None, per_metric=2)
-        vital_history = _query_vital_history(subject_id, hadm_id=None, per_metric=2)
-        readout = _build_readout(subject_id, omr_history, lab_history, vital_history)
+        omr_history, lab_history, vital_history = await asyncio.gather(
+            asyncio.to_thread(
+                _query_omr_history, subject_id, per_metric=2, snapshot=snapshot
+            ),
+            asyncio.to_thread(
+                _query_lab_history,
+                subject_id,
+                hadm_id=None,
+                per_metric=2,
+                snapshot=snapshot,
+            ),
+            asyncio.to_thread(
+                _query_vital_history,
+                subject_id,
+                hadm_id=None,
+                per_metric=2,
+                snapshot=snapshot,
+            ),
+        )
+        readout, latest_labs, latest_vitals = _build_readout_and_latest(
+            subject_id, omr_history, lab_history, vital_history
+        )
 
         summary = (
             f"Health readout for patient {subject_id}: "
@@ -1310,8 +1610,6 @@ def register(mcp: FastMCP) -> None:
         )
         if readout.get("insights"):
             summary += " Key concerns: " + "; ".join(readout["insights"][:3]) + "."
-        latest_labs = _normalize_latest_labs(lab_history)
-        latest_vitals = _normalize_latest_vitals(vital_history)
         summary_markdown = _build_readout_markdown(
             subject_id=subject_id,
             readout=readout,
@@ -4,7 +4,19 @@ from mcp.server.fastmcp import FastMCP
 from mcp.types import CallToolResult, TextContent
 
 import db
-from tools.markdown import md_table
+from tools.markdown import md_table, value_unit
+
+# Fixed SQL lives at module level so DuckDB receives identical statement
+# text on every call (same pattern as tools/admissions.py). The filtered
+# lab-results query stays inline because its WHERE clause is dynamic.
+LAB_CATEGORIES_SQL = """
+    SELECT DISTINCT di.category, COUNT(*) AS count
+    FROM mimiciv_hosp.labevents le
+    JOIN mimiciv_hosp.d_labitems di ON le.itemid = di.itemid
+    WHERE le.subject_id = ?
+    GROUP BY di.category
+    ORDER BY count DESC
+"""
 
 
 def register(mcp: FastMCP) -> None:
@@ -44,7 +56,6 @@ def register(mcp: FastMCP) -> None:
 
         where = " AND ".join(conditions)
         safe_limit = max(1, min(limit, 300))
-        params.append(safe_limit)
 
         sql = f"""
             SELECT
@@ -66,50 +77,74 @@ def register(mcp: FastMCP) -> None:
             LIMIT ?
         """
 
-        rows = db.query_df(sql, params)
-        count = len(rows)
-
-        # Also get distinct categories available for this patient
-        categories = db.query_df(
-            """
-            SELECT DISTINCT di.category, COUNT(*) AS count
+        count_sql = f"""
+            SELECT COUNT(*)
             FROM mimiciv_hosp.labevents le
             JOIN mimiciv_hosp.d_labitems di ON le.itemid = di.itemid
-            WHERE le.subject_id = ?
-            GROUP BY di.category
-            ORDER BY count DESC
-            """,
-            [subject_id],
+            WHERE {where}
+        """
+
+        # One pooled borrow for the rows and the true match count (the
+        # fetch is capped at safe_limit, so counting fetched rows would
+        # undercount).
+        table, count_table = db.query_many(
+            [
+                (sql, [*params, safe_limit]),
+                (count_sql, params),
+            ]
         )
+        rows = db.records_from_table(table)
+        count = count_table.column(0)[0].as_py()
+
+        # The category rollup depends only on subject_id and the data is
+        # immutable for the life of the process, so repeat calls for the
+        # same patient serve it from the statement cache.
+        categories_table = db.query_arrow_cached(LAB_CATEGORIES_SQL, [subject_id])
+        categories = db.records_from_table(categories_table)
 
         summary = f"Found {count} lab result(s) for patient {subject_id}"
         if category:
             summary += f" in category '{category}'"
         summary += "."
 
-        preview_rows = rows[:12]
+        # Render previews straight from the Arrow columns (same pattern as
+        # tools/admissions.py) instead of probing row dicts cell by cell.
+        preview = table.slice(0, 12)
         result_table = md_table(
             ["Chart Time", "Test", "Category", "Value", "Flag"],
-            [
-                [
-                    row.get("charttime"),
-                    row.get("test_name"),
-                    row.get("category"),
-                    (
-                        f"{row.get('valuenum') if row.get('valuenum') is not None else row.get('value')} "
-                        f"{row.get('unit') or ''}"
-                    ).strip(),
-                    row.get("flag") or "normal",
-                ]
-                for row in preview_rows
-            ],
+            (
+                (
+                    charttime,
+                    test_name,
+                    cat,
+                    value_unit(
+                        valuenum if valuenum is not None else value, unit
+                    ),
+                    flag or "normal",
+                )
+                for charttime, test_name, cat, value, valuenum, unit, flag in zip(
+                    *(
+                        preview.column(name).to_pylist()
+                        for name in (
+                            "charttime",
+                            "test_name",
+                            "category",
+                            "value",
+                            "valuenum",
+                            "unit",
+                            "flag",
+                        )
+                    )
+                )
+            ),
         )
+        cat_preview = categories_table.slice(0, 10)
         category_table = md_table(
             ["Category", "Count"],
-            [
-                [row.get("category"), row.get("count")]
-                for row in categories[:10]
-            ],
+            zip(
+                cat_preview.column("category").to_pylist(),
+                cat_preview.column("count").to_pylist(),
+            ),
         )
         markdown = "\n\n".join(
             [
@@ -118,8 +153,8 @@ def register(mcp: FastMCP) -> None:
                 "### Latest Measurements",
                 result_table,
                 (
-                    f"_Showing first {len(preview_rows)} of {count} result(s)._"
-                    if count > len(preview_rows)
+                    f"_Showing first {preview.num_rows} of {count} result(s)._"
+                    if count > preview.num_rows
                     else "_Showing all results._"
                 ),
                 "### Available Categories",
@@ -132,6 +167,7 @@ def register(mcp: FastMCP) -> None:
             structuredContent={
                 "labs": rows,
                 "count": count,
+                "returned": table.num_rows,
                 "categories": categories,
                 "subject_id": subject_id,
             },
@@ -190,36 +226,53 @@ def register(mcp: FastMCP) -> None:
             ORDER BY le.charttime ASC
         """
 
-        rows = db.query_df(sql, params)
+        table = db.query_arrow(sql, params)
+        rows = db.records_from_table(table)
+        count = table.num_rows
 
-        test_name = rows[0]["test_name"] if rows else (item_label or str(itemid))
-        preview_rows = rows[-20:]
+        test_name = (
+            table.column("test_name")[0].as_py()
+            if count
+            else (item_label or str(itemid))
+        )
+        preview = table.slice(max(0, count - 20))
         trend_table = md_table(
             ["Chart Time", "Value", "Unit", "Ref Range", "Flag"],
-            [
-                [
-                    row.get("charttime"),
-                    row.get("valuenum"),
-                    row.get("unit"),
+            (
+                (
+                    charttime,
+                    valuenum,
+                    unit,
                     (
-                        f"{row.get('ref_range_lower')} - {row.get('ref_range_upper')}"
-                        if row.get("ref_range_lower") is not None
-                        and row.get("ref_range_upper") is not None
+                        f"{ref_lower} - {ref_upper}"
+                        if ref_lower is not None and ref_upper is not None
                         else "n/a"
                     ),
-                    row.get("flag") or "normal",
-                ]
-                for row in preview_rows
-            ],
+                    flag or "normal",
+                )
+                for charttime, valuenum, unit, ref_lower, ref_upper, flag in zip(
+                    *(
+                        preview.column(name).to_pylist()
+                        for name in (
+                            "charttime",
+                            "valuenum",
+                            "unit",
+                            "ref_range_lower",
+                            "ref_range_upper",
+                            "flag",
+                        )
+                    )
+                )
+            ),
         )
         markdown = "\n\n".join(
             [
                 f"## Lab Trend: {test_name}",
-                f"Found **{len(rows)}** measurement(s) for patient **{subject_id}**.",
+                f"Found **{count}** measurement(s) for patient **{subject_id}**.",
                 trend_table,
                 (
-                    f"_Showing most recent {len(preview_rows)} of {len(rows)} measurement(s)._"
-                    if len(rows) > len(preview_rows)
+                    f"_Showing most recent {preview.num_rows} of {count} measurement(s)._"
+                    if count > preview.num_rows
                     else "_Showing all measurements._"
                 ),
             ]
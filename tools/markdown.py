@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
+import functools
+import io
+import itertools
 from typing import Any, Iterable, Sequence
 
 
+# What md_table renders for an empty row set; callers that already know
+# their rows are empty can write it directly and skip the call.
+MD_NO_DATA = "_No data._"
+
+
 def fmt(value: Any, fallback: str = "n/a") -> str:
     """Normalize arbitrary values for display."""
     if value is None:
@@ -13,25 +21,75 @@ def fmt(value: Any, fallback: str = "n/a") -> str:
     return text if text else fallback
 
 
+# str.translate with a maketrans table escapes in one C-level pass
+# instead of three chained replace() calls per cell.
+_ESCAPE_TABLE = str.maketrans({"\\": "\\\\", "|": "\\|", "\n": " "})
+
+
 def md_escape(value: Any) -> str:
     """Escape markdown-table control chars."""
-    text = fmt(value)
-    return text.replace("\\", "\\\\").replace("|", "\\|").replace("\n", " ")
-
-
-def md_table(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> str:
-    """Render a markdown table from rows."""
-    rows = list(rows)
-    if not rows:
-        return "_No data._"
-
-    header_line = "| " + " | ".join(md_escape(h) for h in headers) + " |"
-    separator_line = "| " + " | ".join("---" for _ in headers) + " |"
-    body_lines = [
-        "| " + " | ".join(md_escape(cell) for cell in row) + " |"
-        for row in rows
-    ]
-    return "\n".join([header_line, separator_line, *body_lines])
+    # Most cells arrive as non-empty strings already; skip the fmt()
+    # str()/strip() round-trip for them.
+    if isinstance(value, str):
+        text = value.strip() or "n/a"
+    else:
+        text = fmt(value)
+    return text.translate(_ESCAPE_TABLE)
+
+
+def value_unit(value: Any, unit: str | None) -> str:
+    """Format a measurement cell like ``"120 mmHg"`` (``"n/a"`` when missing)."""
+    unit = unit or ""
+    return ("n/a " + unit if value is None else f"{value} {unit}").rstrip()
+
+
+@functools.lru_cache(maxsize=64)
+def _table_prefix(headers: tuple[str, ...]) -> str:
+    """Header plus separator lines, cached per distinct header tuple.
+
+    The call sites pass a handful of module-level tuples, so after the
+    first render of each table shape the prefix is a dict hit.
+    """
+    return "| %s |\n| %s |" % (
+        " | ".join(md_escape(h) for h in headers),
+        " | ".join(("---",) * len(headers)),
+    )
+
+
+def md_table(
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    out: io.StringIO | None = None,
+) -> str | None:
+    """Render a markdown table from rows.
+
+    Rows are consumed lazily — callers pass generators or zipped Arrow
+    columns and no intermediate list of row sequences is built. With
+    ``out`` given, lines stream into the buffer as they are built (for
+    callers assembling a larger document) instead of materializing the
+    joined table string.
+    """
+    rows = iter(rows)
+    try:
+        first = next(rows)
+    except StopIteration:
+        if out is None:
+            return MD_NO_DATA
+        out.write(MD_NO_DATA)
+        return None
+
+    prefix = _table_prefix(tuple(headers))
+    body_lines = (
+        "| %s |" % " | ".join(md_escape(cell) for cell in row)
+        for row in itertools.chain((first,), rows)
+    )
+    if out is None:
+        return "\n".join([prefix, *body_lines])
+    out.write(prefix)
+    for line in body_lines:
+        out.write("\n")
+        out.write(line)
+    return None
 
 
 def md_bullets(items: Iterable[Any], empty_text: str = "_None._") -> str:
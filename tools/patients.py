@@ -64,9 +64,13 @@ def register(mcp: FastMCP) -> None:
             LIMIT 50
         """
 
-        rows = db.query_df(sql, params)
-        count = len(rows)
-        preview_rows = rows[:10]
+        table = db.query_arrow(sql, params)
+        rows = db.records_from_table(table)
+        count = table.num_rows
+
+        # Render the preview straight from the Arrow columns (same pattern
+        # as tools/admissions.py) instead of probing row dicts cell by cell.
+        preview = table.slice(0, 10)
         markdown = "\n\n".join(
             [
                 "## Patient Search Results",
@@ -80,21 +84,23 @@ def register(mcp: FastMCP) -> None:
                         "Anchor Year Group",
                         "DOD",
                     ],
-                    [
-                        [
-                            row.get("subject_id"),
-                            row.get("gender"),
-                            row.get("anchor_age"),
-                            row.get("num_admissions"),
-                            row.get("anchor_year_group"),
-                            row.get("dod"),
-                        ]
-                        for row in preview_rows
-                    ],
+                    zip(
+                        *(
+                            preview.column(name).to_pylist()
+                            for name in (
+                                "subject_id",
+                                "gender",
+                                "anchor_age",
+                                "num_admissions",
+                                "anchor_year_group",
+                                "dod",
+                            )
+                        )
+                    ),
                 ),
                 (
-                    f"_Showing first {len(preview_rows)} of {count} result(s)._"
-                    if count > len(preview_rows)
+                    f"_Showing first {preview.num_rows} of {count} result(s)._"
+                    if count > preview.num_rows
                     else "_Showing all results._"
                 ),
             ]
@@ -1,5 +1,8 @@
 """ICU vital signs tools."""
 
+import asyncio
+import io
+
 from mcp.server.fastmcp import FastMCP
 from mcp.types import CallToolResult, TextContent
 
@@ -18,7 +21,135 @@ VITAL_ITEMIDS = {
     "Temperature (C)": [223762],
 }
 
-ALL_VITAL_IDS = [vid for ids in VITAL_ITEMIDS.values() for vid in ids]
+# Deduped (no group shares an itemid today, but guard anyway) and frozen
+# as a tuple: the same object is passed as the unnest parameter on every
+# call, so nothing downstream should be able to mutate it.
+ALL_VITAL_IDS: tuple[int, ...] = tuple(
+    dict.fromkeys(vid for ids in VITAL_ITEMIDS.values() for vid in ids)
+)
+
+# Display names come from this import-time map rather than a d_items
+# join: the itemid set is already constrained to VITAL_ITEMIDS, so the
+# join only ever resolved labels we know statically. Dropping it keeps
+# the chartevents query a single-table scan.
+_ID_TO_LABEL = {
+    vid: name for name, ids in VITAL_ITEMIDS.items() for vid in ids
+}
+
+# Each vital records one canonical unit in chartevents (verified against
+# the demo data), so the unit comes from this map as well and valueuom
+# never has to leave DuckDB.
+_GROUP_UNITS = {
+    "Heart Rate": "bpm",
+    "Systolic BP": "mmHg",
+    "Diastolic BP": "mmHg",
+    "Mean BP": "mmHg",
+    "Respiratory Rate": "insp/min",
+    "SpO2": "%",
+    "Temperature (F)": "°F",
+    "Temperature (C)": "°C",
+}
+
+_ID_TO_UNIT = {
+    vid: _GROUP_UNITS[name]
+    for name, ids in VITAL_ITEMIDS.items()
+    for vid in ids
+}
+
+# The itemid groups echoed in every get_vitals structuredContent never
+# change, so the payload dict is built once here instead of per call.
+_VITAL_GROUPS_OUT = {name: list(ids) for name, ids in VITAL_ITEMIDS.items()}
+
+# Fixed SQL lives at module level so DuckDB receives identical statement
+# text on every call (same pattern as tools/admissions.py).
+ICU_STAYS_SQL = """
+    SELECT stay_id, hadm_id, intime, outtime,
+           first_careunit, last_careunit, los
+    FROM mimiciv_icu.icustays
+    WHERE subject_id = ?
+    ORDER BY intime
+"""
+
+# list_icu_stays renders at most 20 rows, so its fetch is capped in SQL
+# and the windowed count (evaluated before LIMIT applies) reports the
+# true total. get_vitals keeps the uncapped statement above: it needs
+# the full stay set for ownership validation.
+ICU_STAYS_LIMITED_SQL = """
+    SELECT stay_id, hadm_id, intime, outtime,
+           first_careunit, last_careunit, los,
+           COUNT(*) OVER () AS total
+    FROM mimiciv_icu.icustays
+    WHERE subject_id = ?
+    ORDER BY intime
+    LIMIT 20
+"""
+
+# The itemid filter joins against an unnested list parameter (the pattern
+# tools/health.py uses for its history queries) instead of expanding an
+# IN (?, ?, ...) chain: the scan probes one hash table per row rather
+# than evaluating a ten-way OR, and the statement text stays fixed.
+VITALS_SQL = """
+    SELECT
+        ce.stay_id,
+        ce.charttime,
+        ce.itemid,
+        ce.valuenum AS value,
+        COUNT(*) OVER () AS total_matches
+    FROM mimiciv_icu.chartevents ce
+    JOIN unnest(?) AS vids(itemid) ON ce.itemid = vids.itemid
+    WHERE ce.subject_id = ?
+        AND ce.valuenum IS NOT NULL
+    ORDER BY ce.charttime DESC
+    LIMIT ?
+"""
+
+# The by-stay variants filter on stay_id alone: the tool has already
+# validated that the stay belongs to the patient, and stay_id implies
+# subject_id, so keeping both predicates would only widen the filter
+# surface DuckDB has to prune against.
+VITALS_BY_STAY_SQL = VITALS_SQL.replace(
+    "WHERE ce.subject_id = ?",
+    "WHERE ce.stay_id = ?",
+)
+
+# Per-vital aggregates returned instead of the raw series by default:
+# a GROUP BY over the same filter costs far less than shipping up to
+# 2000 row dicts through the MCP JSON layer.
+VITALS_SUMMARY_SQL = """
+    SELECT
+        ce.itemid,
+        MIN(ce.valuenum) AS min_value,
+        MAX(ce.valuenum) AS max_value,
+        ROUND(AVG(ce.valuenum), 1) AS mean_value,
+        COUNT(*) AS count
+    FROM mimiciv_icu.chartevents ce
+    JOIN unnest(?) AS vids(itemid) ON ce.itemid = vids.itemid
+    WHERE ce.subject_id = ?
+        AND ce.valuenum IS NOT NULL
+    GROUP BY ce.itemid
+    ORDER BY ce.itemid
+"""
+
+VITALS_SUMMARY_BY_STAY_SQL = VITALS_SUMMARY_SQL.replace(
+    "WHERE ce.subject_id = ?",
+    "WHERE ce.stay_id = ?",
+)
+
+# How much of the series each mode fetches: just the rendered rows by
+# default, the capped full series when include_series is set.
+DISPLAY_LIMIT = 20
+SERIES_LIMIT = 2000
+
+
+# Both tools below ask for the same stays list, and agent sessions tend
+# to call them back-to-back for one patient. Caching at the Arrow-table
+# level (the repo-wide pattern for fixed read-only lookups) makes the
+# second ask a cache hit; callers render previews straight off the
+# table's columns and materialize dicts only for structuredContent. The
+# database never changes within a process, so nothing needs
+# invalidating.
+def _query_icu_stays_table(subject_id: int):
+    return db.query_arrow_cached(ICU_STAYS_SQL, [subject_id])
 
 
 def register(mcp: FastMCP) -> None:
@@ -26,30 +157,29 @@ def register(mcp: FastMCP) -> None:
         name="get_vitals",
         description=(
             "Get ICU vital signs for a patient in the MIMIC-IV database. "
-            "Returns time-series data for heart rate, blood pressure, SpO2, "
-            "respiratory rate, and temperature. Can filter by a specific "
-            "ICU stay_id. Requires subject_id (patient ID)."
+            "Returns recent measurements and per-vital summary statistics "
+            "for heart rate, blood pressure, SpO2, respiratory rate, and "
+            "temperature. Can filter by a specific ICU stay_id. Set "
+            "include_series=true to also return the full time series "
+            "(up to 2000 rows). Requires subject_id (patient ID)."
         ),
         meta={
             "openai/toolInvocation/invoking": "Loading vital signs...",
             "openai/toolInvocation/invoked": "Vital signs ready (v4)",
         },
     )
-    def get_vitals(
+    async def get_vitals(
         subject_id: int,
         stay_id: int | None = None,
+        include_series: bool = False,
     ) -> CallToolResult:
-        # First, find ICU stays for this patient
-        stays = db.query_df(
-            """
-            SELECT stay_id, hadm_id, intime, outtime,
-                   first_careunit, last_careunit, los
-            FROM mimiciv_icu.icustays
-            WHERE subject_id = ?
-            ORDER BY intime
-            """,
-            [subject_id],
+        # DuckDB calls block, so they run on worker threads (the
+        # tools/health.py pattern) and leave the event loop free for
+        # concurrent tool calls. First, find ICU stays for this patient.
+        stays_table = await asyncio.to_thread(
+            _query_icu_stays_table, subject_id
         )
+        stays = db.records_from_table(stays_table)
 
         if not stays:
             markdown = "\n\n".join(
@@ -68,82 +198,164 @@ def register(mcp: FastMCP) -> None:
                 structuredContent={"vitals": [], "stays": [], "subject_id": subject_id},
             )
 
-        # Build conditions
-        conditions = ["ce.subject_id = ?"]
-        params: list = [subject_id]
-
-        id_placeholders = ",".join("?" * len(ALL_VITAL_IDS))
-        conditions.append(f"ce.itemid IN ({id_placeholders})")
-        params.extend(ALL_VITAL_IDS)
-
+        fetch_limit = SERIES_LIMIT if include_series else DISPLAY_LIMIT
         if stay_id is not None:
-            conditions.append("ce.stay_id = ?")
-            params.append(stay_id)
-
-        where = " AND ".join(conditions)
-
-        sql = f"""
-            SELECT
-                ce.stay_id,
-                ce.charttime,
-                ce.itemid,
-                di.label AS vital_name,
-                ce.valuenum AS value,
-                ce.valueuom AS unit
-            FROM mimiciv_icu.chartevents ce
-            JOIN mimiciv_icu.d_items di ON ce.itemid = di.itemid
-            WHERE {where}
-                AND ce.valuenum IS NOT NULL
-            ORDER BY ce.charttime
-            LIMIT 2000
-        """
-
-        rows = db.query_df(sql, params)
-
-        target = f"stay {stay_id}" if stay_id else f"patient {subject_id}"
-        recent_vitals = list(reversed(rows[-20:]))
-        markdown = "\n\n".join(
-            [
-                f"## ICU Vitals for {target}",
-                (
-                    f"Retrieved **{len(rows)}** measurement(s) across "
-                    f"**{len(stays)}** ICU stay(s)."
-                ),
-                "### ICU Stays",
-                md_table(
-                    ["Stay ID", "HADM ID", "In Time", "Out Time", "Care Unit"],
+            # Validate against the stays just fetched before dispatching
+            # the chartevents scan: a mistyped stay_id should not cost a
+            # pass over the largest table just to find nothing.
+            if stay_id not in {stay["stay_id"] for stay in stays}:
+                markdown = "\n\n".join(
                     [
-                        [
-                            row.get("stay_id"),
-                            row.get("hadm_id"),
-                            row.get("intime"),
-                            row.get("outtime"),
-                            row.get("first_careunit"),
-                        ]
-                        for row in stays[:10]
-                    ],
-                ),
-                "### Recent Vitals",
-                md_table(
-                    ["Chart Time", "Stay ID", "Vital", "Value", "Unit"],
-                    [
-                        [
-                            row.get("charttime"),
-                            row.get("stay_id"),
-                            row.get("vital_name"),
-                            row.get("value"),
-                            row.get("unit"),
-                        ]
-                        for row in recent_vitals
+                        f"## ICU Vitals for stay {stay_id}",
+                        (
+                            f"Stay {stay_id} was not found for patient "
+                            f"{subject_id}. Use list_icu_stays to see valid "
+                            "stay_id values."
+                        ),
+                    ]
+                )
+                return CallToolResult(
+                    content=[
+                        TextContent(
+                            type="text",
+                            text=markdown,
+                        )
                     ],
+                    structuredContent={
+                        "vitals": [],
+                        "stays": stays,
+                        "subject_id": subject_id,
+                    },
+                )
+            table, summary_table = await asyncio.to_thread(
+                db.query_many,
+                [
+                    (
+                        VITALS_BY_STAY_SQL,
+                        [ALL_VITAL_IDS, stay_id, fetch_limit],
+                    ),
+                    (
+                        VITALS_SUMMARY_BY_STAY_SQL,
+                        [ALL_VITAL_IDS, stay_id],
+                    ),
+                ],
+            )
+        else:
+            table, summary_table = await asyncio.to_thread(
+                db.query_many,
+                [
+                    (VITALS_SQL, [ALL_VITAL_IDS, subject_id, fetch_limit]),
+                    (VITALS_SUMMARY_SQL, [ALL_VITAL_IDS, subject_id]),
+                ],
+            )
+
+        # The window count sees every filter-matched row before LIMIT
+        # applies, so the true total comes back without fetching more
+        # than the capped series. Drop the column before materializing
+        # rows; it is the same value repeated per row.
+        total = (
+            table.column("total_matches")[0].as_py() if table.num_rows else 0
+        )
+        table = table.drop_columns("total_matches")
+        rows = db.records_from_table(table)
+        itemids = table.column("itemid").to_pylist()
+        labels = [_ID_TO_LABEL[i] for i in itemids]
+        units = [_ID_TO_UNIT[i] for i in itemids]
+        for row, label, unit in zip(rows, labels, units):
+            row["vital_name"] = label
+            row["unit"] = unit
+        summary_rows = db.records_from_table(summary_table)
+        for row in summary_rows:
+            row["vital_name"] = _ID_TO_LABEL[row["itemid"]]
+
+        target = f"stay {stay_id}" if stay_id else f"patient {subject_id}"
+        # Previews render straight from the Arrow columns (same pattern
+        # as tools/admissions.py). Rows arrive newest-first from the
+        # DESC top-N query, so the recent slice is simply the head — and
+        # when a patient has more than 2000 measurements it really is
+        # the most recent data, which the old ASC fetch truncated away.
+        stays_preview = stays_table.slice(0, 10)
+        recent = table.slice(0, DISPLAY_LIMIT)
+
+        # The document streams into one buffer; md_table writes straight
+        # into it (same assembly as the health builders), so no
+        # per-section table string is built just to be re-joined.
+        buf = io.StringIO()
+        write = buf.write
+        write(f"## ICU Vitals for {target}\n\n")
+        write(
+            f"Found **{total}** measurement(s) across "
+            f"**{len(stays)}** ICU stay(s)."
+        )
+        write("\n\n### ICU Stays\n\n")
+        md_table(
+            ["Stay ID", "HADM ID", "In Time", "Out Time", "Care Unit"],
+            zip(
+                *(
+                    stays_preview.column(name).to_pylist()
+                    for name in (
+                        "stay_id",
+                        "hadm_id",
+                        "intime",
+                        "outtime",
+                        "first_careunit",
+                    )
+                )
+            ),
+            out=buf,
+        )
+        if rows:
+            write("\n\n### Recent Vitals\n\n")
+            md_table(
+                ["Chart Time", "Stay ID", "Vital", "Value", "Unit"],
+                zip(
+                    recent.column("charttime").to_pylist(),
+                    recent.column("stay_id").to_pylist(),
+                    labels[: recent.num_rows],
+                    recent.column("value").to_pylist(),
+                    units[: recent.num_rows],
                 ),
+                out=buf,
+            )
+            write("\n\n")
+            write(
+                f"_Showing most recent {recent.num_rows} of {total} vitals._"
+                if total > recent.num_rows
+                else "_Showing all vitals._"
+            )
+            write("\n\n### Per-Vital Summary\n\n")
+            md_table(
+                ["Vital", "Itemid", "Min", "Max", "Mean", "Count"],
                 (
-                    f"_Showing most recent {len(recent_vitals)} of {len(rows)} vitals._"
-                    if len(rows) > len(recent_vitals)
-                    else "_Showing all vitals._"
+                    (
+                        row["vital_name"],
+                        row["itemid"],
+                        row["min_value"],
+                        row["max_value"],
+                        row["mean_value"],
+                        row["count"],
+                    )
+                    for row in summary_rows
                 ),
-            ]
-        )
+                out=buf,
+            )
+        else:
+            # No measurements at all: one line instead of two empty
+            # table sections.
+            write(f"\n\n_No vitals recorded for {target}._")
+        markdown = buf.getvalue()
+        structured = {
+            "vitals": rows,
+            "series_included": include_series,
+            "total_matches": total,
+            "vital_summary": summary_rows,
+            "stays": stays,
+            "subject_id": subject_id,
+        }
+        if rows:
+            # The static group map only helps a caller interpret itemids
+            # it actually received; leave it out of the empty payload.
+            structured["vital_groups"] = _VITAL_GROUPS_OUT
         return CallToolResult(
             content=[
                 TextContent(
@@ -151,14 +363,7 @@ def register(mcp: FastMCP) -> None:
                     text=markdown,
                 )
             ],
-            structuredContent={
-                "vitals": rows,
-                "stays": stays,
-                "subject_id": subject_id,
-                "vital_groups": {
-                    name: ids for name, ids in VITAL_ITEMIDS.items()
-                },
-            },
+            structuredContent=structured,
         )
 
     @mcp.tool(
@@ -173,41 +378,44 @@ def register(mcp: FastMCP) -> None:
             "openai/toolInvocation/invoked": "ICU stays loaded",
         },
     )
-    def list_icu_stays(subject_id: int) -> CallToolResult:
-        rows = db.query_df(
-            """
-            SELECT stay_id, hadm_id, intime, outtime,
-                   first_careunit, last_careunit, los
-            FROM mimiciv_icu.icustays
-            WHERE subject_id = ?
-            ORDER BY intime
-            """,
-            [subject_id],
+    async def list_icu_stays(subject_id: int) -> CallToolResult:
+        stays_table = await asyncio.to_thread(
+            db.query_arrow_cached, ICU_STAYS_LIMITED_SQL, [subject_id]
         )
-        markdown = "\n\n".join(
-            [
-                f"## ICU Stays for Patient {subject_id}",
-                f"Found **{len(rows)}** ICU stay(s).",
-                md_table(
-                    ["Stay ID", "HADM ID", "In Time", "Out Time", "LOS (days)"],
-                    [
-                        [
-                            row.get("stay_id"),
-                            row.get("hadm_id"),
-                            row.get("intime"),
-                            row.get("outtime"),
-                            row.get("los"),
-                        ]
-                        for row in rows[:20]
-                    ],
-                ),
-                (
-                    f"_Showing first {min(len(rows), 20)} of {len(rows)} ICU stays._"
-                    if len(rows) > 20
-                    else "_Showing all ICU stays._"
-                ),
-            ]
+        total = (
+            stays_table.column("total")[0].as_py()
+            if stays_table.num_rows
+            else 0
+        )
+        stays_table = stays_table.drop_columns("total")
+        rows = db.records_from_table(stays_table)
+        buf = io.StringIO()
+        write = buf.write
+        write(f"## ICU Stays for Patient {subject_id}\n\n")
+        write(f"Found **{total}** ICU stay(s).\n\n")
+        md_table(
+            ["Stay ID", "HADM ID", "In Time", "Out Time", "LOS (days)"],
+            zip(
+                *(
+                    stays_table.column(name).to_pylist()
+                    for name in (
+                        "stay_id",
+                        "hadm_id",
+                        "intime",
+                        "outtime",
+                        "los",
+                    )
+                )
+            ),
+            out=buf,
+        )
+        write("\n\n")
+        write(
+            f"_Showing first {stays_table.num_rows} of {total} ICU stays._"
+            if total > stays_table.num_rows
+            else "_Showing all ICU stays._"
         )
+        markdown = buf.getvalue()
 
         return CallToolResult(
             content=[
@@ -219,6 +427,6 @@ def register(mcp: FastMCP) -> None:
             structuredContent={
                 "stays": rows,
                 "subject_id": subject_id,
-                "count": len(rows),
+                "count": total,
             },
         )